@@ -0,0 +1,409 @@
+#!/Users/nsanch/kids-project/.venv/bin/python
+
+# times the side-scroller's hot paths on every level in levels.json.
+#
+#   ./benchmark.py --ticks 500 --output before.json
+#   ./benchmark.py --ticks 500 --output after.json --compare before.json
+#
+# each level is played with a few fixed input traces against a fake curses
+# window. for every (level, trace) we record:
+#   - ticks per second for Game.step() + Game.render(), uninstrumented
+#   - per-tick time spent in Game.tick, MovableObject.tick, Game.items_at and
+#     GameWindow.refresh, as p50/p90/p99/max in microseconds
+#   - memory blocks allocated per tick, as p50/p90/p99/max (see
+#     AllocationCounter), and gc collections per 1000 ticks
+#   - the projectile pool's stats (see ProjectilePool.stats)
+#   - flushes and bytes written per frame (see FrameCommitter.stats)
+# results are written as json so runs from different commits can be compared.
+#
+#   ./benchmark.py --generated 10000,100000,1000000,10000000 --output scaling.json
+#
+# plays levels made by level_generator.py with about that many cells instead,
+# to see how things scale with the size of the level. a game that's lost is
+# restarted so every run gets all its ticks. each size also records how long
+# the level takes to compile from text, to load from the compiled cache and to
+# start streaming (see LevelStream), and the peak memory of each.
+
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from frame_commit import FrameCommitter
+from game_items import MovableObject
+from level_cache import cache_path, compile_level
+from level_generator import write_level
+from side_scroller_game import Game, GameWindow, LEVELS_DIR, new_game, stream_game
+
+# generated levels are this many rows high and as wide as it takes.
+GENERATED_HEIGHT = 40
+GENERATED_DENSITY = 0.02
+
+class StubWindow(object):
+  # just enough of a curses window for GameWindow and BufferedCenterableWindow.
+  def __init__(self, lines: int, cols: int):
+    self.lines = lines
+    self.cols = cols
+    self.cells_written = 0
+
+  def subwin(self, lines: int, cols: int, y: int, x: int) -> "StubWindow":
+    return StubWindow(lines, cols)
+
+  def getmaxyx(self) -> tuple[int, int]:
+    return self.lines, self.cols
+
+  def addch(self, y: int, x: int, ch: str) -> None:
+    self.cells_written += 1
+
+  def addstr(self, y: int, x: int, s: str) -> None:
+    self.cells_written += len(s)
+
+  def hline(self, y: int, x: int, ch: str, n: int) -> None:
+    self.cells_written += n
+
+  def clear(self) -> None:
+    pass
+
+  def erase(self) -> None:
+    pass
+
+  def refresh(self) -> None:
+    pass
+
+  def noutrefresh(self) -> None:
+    pass
+
+  def move(self, y: int, x: int) -> None:
+    pass
+
+  def clrtoeol(self) -> None:
+    pass
+
+def idle_trace(ticks: int) -> dict[int, list[str]]:
+  return {}
+
+def run_right_trace(ticks: int) -> dict[int, list[str]]:
+  inputs: dict[int, list[str]] = {}
+  for t in range(ticks):
+    keys = []
+    if t % 4 == 0:
+      keys.append("KEY_RIGHT")
+    if t % 9 == 0:
+      keys.append(" ")
+    if t % 15 == 0:
+      keys.append("f")
+    if keys:
+      inputs[t] = keys
+  return inputs
+
+def back_and_forth_trace(ticks: int) -> dict[int, list[str]]:
+  inputs: dict[int, list[str]] = {}
+  for t in range(ticks):
+    if (t // 40) % 2 == 0:
+      inputs[t] = ["KEY_RIGHT"] if t % 3 == 0 else []
+    else:
+      inputs[t] = ["KEY_LEFT"] if t % 3 == 0 else []
+    if t % 11 == 0:
+      inputs[t].append("KEY_UP")
+  return inputs
+
+TRACES = {
+  "idle": idle_trace,
+  "run-right": run_right_trace,
+  "back-and-forth": back_and_forth_trace,
+}
+
+def read_level_paths() -> list[tuple[int, str]]:
+  with open(os.path.join(LEVELS_DIR, "levels.json")) as f:
+    levels_json: list[dict] = json.load(f)
+  return [(level["id"], os.path.join(LEVELS_DIR, level["path"])) for level in levels_json]
+
+def percentiles(samples: list[float]) -> dict[str, float]:
+  if len(samples) == 0:
+    return {"p50": 0.0, "p90": 0.0, "p99": 0.0, "max": 0.0}
+  ordered = sorted(samples)
+  def at(fraction):
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+  return {"p50": at(0.5), "p90": at(0.9), "p99": at(0.99), "max": ordered[-1]}
+
+class PhaseTimer(object):
+  # wraps methods so the time spent in them is added up per tick. the original
+  # methods are put back by restore().
+  def __init__(self):
+    self.current: dict[str, float] = {}
+    self.samples: dict[str, list[float]] = {}
+    self.__patched: list[tuple[type, str, object]] = []
+
+  def wrap(self, cls: type, method_name: str, phase: str) -> None:
+    original = cls.__dict__[method_name]
+    current = self.current
+    current[phase] = 0.0
+    self.samples[phase] = []
+
+    def timed(*args, **kwargs):
+      start = time.perf_counter()
+      try:
+        return original(*args, **kwargs)
+      finally:
+        current[phase] += time.perf_counter() - start
+
+    setattr(cls, method_name, timed)
+    self.__patched.append((cls, method_name, original))
+
+  def end_tick(self) -> None:
+    for phase in self.current:
+      # microseconds
+      self.samples[phase].append(self.current[phase] * 1e6)
+      self.current[phase] = 0.0
+
+  def restore(self) -> None:
+    for cls, method_name, original in reversed(self.__patched):
+      setattr(cls, method_name, original)
+    self.__patched = []
+
+class AllocationCounter(object):
+  # counts the memory blocks allocated in each tick, including the garbage
+  # that's freed again before the tick ends (what pooling and __slots__ cut
+  # down). sys.getallocatedblocks() only says how many are in use, so it's
+  # read on every function call and return and the increases are added up.
+  # an object made and dropped between two calls is missed.
+  def __init__(self):
+    self.samples: list[float] = []
+    self.__allocated = 0
+    self.__last = 0
+
+  def __profile(self, frame, event, arg) -> None:
+    blocks = sys.getallocatedblocks()
+    if blocks > self.__last:
+      self.__allocated += blocks - self.__last
+    self.__last = blocks
+
+  def start(self) -> None:
+    self.__last = sys.getallocatedblocks()
+    sys.setprofile(self.__profile)
+
+  def stop(self) -> None:
+    sys.setprofile(None)
+
+  def end_tick(self) -> None:
+    self.samples.append(self.__allocated)
+    self.__allocated = 0
+
+def play(path: str, level: int, inputs: dict[int, list[str]], ticks: int, lines: int, cols: int,
+         after_tick=None, frame: FrameCommitter|None=None, keep_playing: bool=False) -> tuple[Game, int]:
+  # with keep_playing, a game that's over is restarted until all the ticks
+  # have run.
+  game = new_game(compile_level(path)[0], level, seed=level)
+  if frame is None:
+    frame = FrameCommitter(doupdate=lambda: None)
+  game_window = GameWindow(StubWindow(lines, cols), frame)
+  ticks_run = 0
+  while ticks_run < ticks:
+    if game.game_over():
+      if not keep_playing:
+        break
+      game.restart()
+    for k in inputs.get(ticks_run, []):
+      game.accept_keypress(k, None)
+    game.step()
+    game.render(game_window)
+    ticks_run += 1
+    if after_tick is not None:
+      after_tick()
+  return game, ticks_run
+
+def bench_level(path: str, level: int, trace: str, ticks: int, lines: int, cols: int,
+                keep_playing: bool=False) -> dict:
+  inputs = TRACES[trace](ticks)
+
+  start = time.perf_counter()
+  frame = FrameCommitter(doupdate=lambda: None)
+  game, ticks_run = play(path, level, inputs, ticks, lines, cols, frame=frame, keep_playing=keep_playing)
+  elapsed = time.perf_counter() - start
+
+  timer = PhaseTimer()
+  timer.wrap(Game, "tick", "game_tick")
+  timer.wrap(MovableObject, "tick", "movable_tick")
+  timer.wrap(Game, "items_at", "items_at")
+  timer.wrap(GameWindow, "refresh", "window_refresh")
+  try:
+    play(path, level, inputs, ticks, lines, cols, after_tick=timer.end_tick, keep_playing=keep_playing)
+  finally:
+    timer.restore()
+
+  gc.collect()
+  collections_before = sum(stat["collections"] for stat in gc.get_stats())
+  play(path, level, inputs, ticks, lines, cols, keep_playing=keep_playing)
+  collections_after = sum(stat["collections"] for stat in gc.get_stats())
+
+  # counting slows everything down, so this gets a run of its own.
+  allocations = AllocationCounter()
+  allocations.start()
+  try:
+    play(path, level, inputs, ticks, lines, cols, after_tick=allocations.end_tick, keep_playing=keep_playing)
+  finally:
+    allocations.stop()
+
+  return {
+    "level": level,
+    "trace": trace,
+    "ticks": ticks_run,
+    "final_actors": len(game.items),
+    "ticks_per_second": ticks_run / elapsed if elapsed > 0 else None,
+    "phases_us": {phase: percentiles(samples) for phase, samples in timer.samples.items()},
+    "allocations_per_tick": percentiles(allocations.samples),
+    "gc_collections_per_1000_ticks": 1000 * (collections_after - collections_before) / max(1, ticks_run),
+    "projectile_pool": game.projectiles.stats(),
+    "frames": frame.stats(),
+  }
+
+def generated_level(cells: int, level_dir: str, seed: int) -> tuple[str, float|None]:
+  # returns the level's path and how long it took to make, or None if it was
+  # already there from an earlier run.
+  width = max(1, cells // GENERATED_HEIGHT)
+  path = os.path.join(level_dir, f"generated-{GENERATED_HEIGHT}x{width}-{seed}-{GENERATED_DENSITY}.txt")
+  if os.path.exists(path):
+    return path, None
+  start = time.perf_counter()
+  write_level(path, GENERATED_HEIGHT, width, seed, GENERATED_DENSITY)
+  return path, time.perf_counter() - start
+
+def measure(load) -> tuple[float, int]:
+  # seconds and peak kilobytes allocated for load(). tracemalloc slows things
+  # down, so the time comes from a separate run.
+  start = time.perf_counter()
+  load()
+  elapsed = time.perf_counter() - start
+  tracemalloc.start()
+  try:
+    load()
+    peak = tracemalloc.get_traced_memory()[1]
+  finally:
+    tracemalloc.stop()
+  return elapsed, peak // 1024
+
+def bench_loading(path: str, level: int) -> dict:
+  def compile_from_text():
+    try:
+      os.remove(cache_path(path))
+    except OSError:
+      pass
+    new_game(compile_level(path)[0], level, seed=level)
+
+  compile_s, compile_kb = measure(compile_from_text)
+  cached_s, cached_kb = measure(lambda: new_game(compile_level(path)[0], level, seed=level))
+  stream_s, stream_kb = measure(lambda: stream_game(path, level, seed=level))
+  return {
+    "compile_s": compile_s,
+    "compile_peak_kb": compile_kb,
+    "cached_s": cached_s,
+    "cached_peak_kb": cached_kb,
+    "stream_s": stream_s,
+    "stream_peak_kb": stream_kb,
+  }
+
+def bench_generated(sizes: list[int], level_dir: str, traces: list[str], ticks: int, lines: int, cols: int) -> list[dict]:
+  os.makedirs(level_dir, exist_ok=True)
+  results = []
+  print(f"{'cells':>10} {'columns':>8} {'compile':>8} {'cached':>8} {'stream':>8} {'trace':<15} {'ticks/s':>9} {'tick p50':>10} {'refresh p50':>12}")
+  for cells in sizes:
+    # generated levels are numbered by their size.
+    path, generate_s = generated_level(cells, level_dir, seed=cells)
+    loading = bench_loading(path, cells)
+    runs = [bench_level(path, cells, trace, ticks, lines, cols, keep_playing=True) for trace in traces]
+    results.append({
+      "cells": cells,
+      "rows": GENERATED_HEIGHT,
+      "columns": max(1, cells // GENERATED_HEIGHT),
+      "file_bytes": os.path.getsize(path),
+      "generate_s": generate_s,
+      "loading": loading,
+      "runs": runs,
+    })
+    for run in runs:
+      phases = run["phases_us"]
+      print(f"{cells:>10} {max(1, cells // GENERATED_HEIGHT):>8} {loading['compile_s']:>7.3f}s {loading['cached_s']:>7.3f}s "
+            f"{loading['stream_s']:>7.3f}s {run['trace']:<15} {run['ticks_per_second']:>9.0f} "
+            f"{phases['game_tick']['p50']:>8.1f}us {phases['window_refresh']['p50']:>10.1f}us")
+  return results
+
+def git_commit() -> str|None:
+  try:
+    out = subprocess.run(["git", "rev-parse", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+                         capture_output=True, text=True, check=True)
+    return out.stdout.strip()
+  except (OSError, subprocess.CalledProcessError):
+    return None
+
+def compare(old: dict, new: dict) -> None:
+  old_runs = {(r["level"], r["trace"]): r for r in old["runs"]}
+  print(f"{'level':>5} {'trace':<15} {'old ticks/s':>12} {'new ticks/s':>12} {'change':>8}")
+  for run in new["runs"]:
+    old_run = old_runs.get((run["level"], run["trace"]))
+    if old_run is None or not old_run["ticks_per_second"] or not run["ticks_per_second"]:
+      continue
+    change = run["ticks_per_second"] / old_run["ticks_per_second"]
+    print(f"{run['level']:>5} {run['trace']:<15} {old_run['ticks_per_second']:>12.0f} {run['ticks_per_second']:>12.0f} {change:>7.2f}x")
+
+def main(argv: list[str]) -> int:
+  parser = argparse.ArgumentParser(description="Benchmark the side-scroller on every level.")
+  parser.add_argument("--ticks", type=int, default=500, help="ticks to run per level and trace")
+  parser.add_argument("--levels", help="comma separated level ids, defaults to all of levels.json")
+  parser.add_argument("--traces", default=",".join(TRACES), help="comma separated input traces to replay")
+  parser.add_argument("--size", default="30x80", help="fake terminal size as LINESxCOLS")
+  parser.add_argument("--output", default="benchmark-results.json", help="where to write the json results")
+  parser.add_argument("--compare", help="earlier results file to compare ticks/s against")
+  parser.add_argument("--generated", help="comma separated level sizes in cells to generate and play instead")
+  parser.add_argument("--level-dir", default=os.path.join(tempfile.gettempdir(), "side-scroller-generated"),
+                      help="where to keep generated levels between runs")
+  args = parser.parse_args(argv)
+
+  lines, cols = (int(n) for n in args.size.split("x"))
+  if args.generated:
+    sizes = [int(n) for n in args.generated.split(",")]
+    results = {
+      "commit": git_commit(),
+      "python": sys.version.split()[0],
+      "ticks": args.ticks,
+      "size": [lines, cols],
+      "generated": bench_generated(sizes, args.level_dir, args.traces.split(","), args.ticks, lines, cols),
+    }
+    with open(args.output, "w") as f:
+      json.dump(results, f, indent=2)
+    return 0
+
+  levels = read_level_paths()
+  if args.levels:
+    wanted = {int(l) for l in args.levels.split(",")}
+    levels = [(level, path) for level, path in levels if level in wanted]
+
+  runs = []
+  for level, path in levels:
+    for trace in args.traces.split(","):
+      run = bench_level(path, level, trace, args.ticks, lines, cols)
+      runs.append(run)
+      tick_p50 = run["phases_us"]["game_tick"]["p50"]
+      print(f"level {level:>2} {trace:<15} {run['ticks']:>5} ticks  {run['ticks_per_second']:>9.0f} ticks/s  "
+            f"tick p50 {tick_p50:>8.1f}us  {run['allocations_per_tick']['p50']:>7.0f} allocations/tick")
+
+  results = {
+    "commit": git_commit(),
+    "python": sys.version.split()[0],
+    "ticks": args.ticks,
+    "size": [lines, cols],
+    "runs": runs,
+  }
+  with open(args.output, "w") as f:
+    json.dump(results, f, indent=2)
+
+  if args.compare:
+    with open(args.compare) as f:
+      compare(json.load(f), results)
+  return 0
+
+if __name__ == "__main__":
+  sys.exit(main(sys.argv[1:]))
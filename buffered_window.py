@@ -1,53 +1,96 @@
 import curses
 
 class BufferedCenterableWindow(object):
-  def __init__(self, win: curses.window):
+  def __init__(self, win: curses.window, double_buffered: bool = False):
     self.__win = win
     self.__buffer = {}
     self.__last_player_location: list[tuple[int, int]] = [(0,0)]
+    # when double buffered, clear() keeps what's on screen and refresh() only
+    # rewrites the cells that differ from the last frame.
+    self.__double_buffered = double_buffered
+    self.__last_frame: dict[tuple[int, int], str] = {}
+    # the largest y and x written since the last clear(), plus an optional
+    # hint for the size of the whole world, so we never rescan the buffer.
+    self.__max_y: int = 0
+    self.__max_x: int = 0
+    self.__world_size: tuple[int, int]|None = None
+
+  def set_world_size(self, height: int, width: int) -> None:
+    self.__world_size = (height, width)
+
+  def extents(self) -> tuple[int, int]|None:
+    if self.__world_size is None:
+      if len(self.__buffer) == 0:
+        return None
+      return self.__max_y, self.__max_x
+    world_max_y, world_max_x = self.__world_size[0] - 1, self.__world_size[1] - 1
+    if len(self.__buffer) == 0:
+      return world_max_y, world_max_x
+    return max(self.__max_y, world_max_y), max(self.__max_x, world_max_x)
 
   def clear(self):
     self.__buffer = {}
-    self.__win.clear()
+    if not self.__double_buffered:
+      self.__win.clear()
 
   def repaint(self):
     self.__win.clear()
+    self.__last_frame = {}
     self.refresh(self.__last_player_location)
   
-  def refresh(self, player_location: list[tuple[int, int]]):
+  def refresh(self, player_location: list[tuple[int, int]], viewport=None):
+    self.draw(player_location, viewport)
+    self.__win.refresh()
+
+  def noutrefresh(self):
+    self.__win.noutrefresh()
+
+  def draw(self, player_location: list[tuple[int, int]], viewport=None):
+    # writes the frame to the curses window without sending it to the
+    # terminal, for callers that stage several windows with a FrameCommitter.
     self.__last_player_location = player_location
-    max_y = max([k[0] for k in self.__buffer.keys()])
-    max_x = max([k[1] for k in self.__buffer.keys()])
-    if max_y < self.__win.getmaxyx()[0] and max_x < self.__win.getmaxyx()[1]:
-      for (y,x), ch in self.__buffer.items():
-        game_y = y
-        game_x = x
-        screen_y = self.__win.getmaxyx()[0] - game_y - 1
-        self.__win.addch(screen_y, x, ch)
+    frame = self.compose_frame(player_location, viewport)
+    if self.__double_buffered:
+      # only send curses the cells that changed since the last frame.
+      for pos in self.__last_frame.keys() - frame.keys():
+        self.__win.addch(pos[0], pos[1], " ")
+      for pos, ch in frame.items():
+        if self.__last_frame.get(pos) != ch:
+          self.__win.addch(pos[0], pos[1], ch)
+      self.__last_frame = frame
     else:
-      bottom_left, top_right = self.center_around(player_location)
-      for (y,x), ch in self.__buffer.items():
-        if y < bottom_left[0] or y >= top_right[0]:
-          continue
-        if x < bottom_left[1] or x >= top_right[1]:
-          continue
-        game_y = y - bottom_left[0]
-        game_x = x - bottom_left[1]
-        screen_y = self.__win.getmaxyx()[0] - game_y - 1
-        screen_x = game_x
-        maxyx = self.__win.getmaxyx()
-        # cannot write to bottom-right corner for some reason.
-        if screen_y == maxyx[0]-1 and screen_x == maxyx[1]-1:
-          continue
-        self.__win.addch(screen_y, screen_x, ch)
-    self.__win.refresh()
+      for pos, ch in frame.items():
+        self.__win.addch(pos[0], pos[1], ch)
+
+  def compose_frame(self, player_location: list[tuple[int, int]], viewport=None) -> dict[tuple[int, int], str]:
+    # maps screen (y, x) to the character that should be drawn there. callers
+    # that already called center_around() can pass its result as the viewport.
+    frame = {}
+    if viewport is None:
+      viewport = self.center_around(player_location)
+    bottom_left, top_right = viewport
+    maxyx = self.__win.getmaxyx()
+    for (y,x), ch in self.__buffer.items():
+      if y < bottom_left[0] or y >= top_right[0]:
+        continue
+      if x < bottom_left[1] or x >= top_right[1]:
+        continue
+      game_y = y - bottom_left[0]
+      game_x = x - bottom_left[1]
+      screen_y = maxyx[0] - game_y - 1
+      screen_x = game_x
+      # cannot write to bottom-right corner for some reason.
+      if screen_y == maxyx[0]-1 and screen_x == maxyx[1]-1:
+        continue
+      frame[(screen_y, screen_x)] = ch
+    return frame
 
   def center_around(self, player_location: list[tuple[int, int]]):
-    if len(self.__buffer) == 0:
+    extents = self.extents()
+    if extents is None:
       return (0, 0), self.__win.getmaxyx()
 
-    max_y_to_paint = max([k[0] for k in self.__buffer.keys()])
-    max_x_to_paint = max([k[1] for k in self.__buffer.keys()])
+    max_y_to_paint, max_x_to_paint = extents
     game_window_height, game_window_width = self.__win.getmaxyx()
 
     if max_y_to_paint < game_window_height:
@@ -75,6 +118,14 @@ class BufferedCenterableWindow(object):
     return bottom_left, top_right
 
   def addch(self, y: int, x: int, ch: str) -> None:
+    if len(self.__buffer) == 0:
+      self.__max_y = y
+      self.__max_x = x
+    else:
+      if y > self.__max_y:
+        self.__max_y = y
+      if x > self.__max_x:
+        self.__max_x = x
     self.__buffer[(y, x)] = ch
 
   def addstr(self, y: int, x: int, str: str) -> None:
@@ -0,0 +1,128 @@
+from level_cache import build_actors
+from game_items import GameObject, GAME_OBJECT_FACTORIES, Player
+
+# big levels have far more actors than are ever near the player, so the world
+# is split into CHUNK_HEIGHT x CHUNK_WIDTH chunks and only the chunks around
+# the player are in the game (ticking, colliding and rendering). the rest are
+# parked:
+#   - a chunk the player has never been near is just its (character, position)
+#     entries from the compiled level. nothing is made until it wakes up.
+#   - a chunk that was awake holds its actors and the snapshot_state() they
+#     had when they were parked, and they pick up from there when it wakes.
+# actors that wander out of the active chunks are parked in whichever chunk
+# they end up in. the player is never parked. bricks live in the StaticLayer,
+# which is already one byte per cell, so they aren't chunked.
+#
+# with a LevelStream the chunks aren't even read from the level file until
+# the player gets near them.
+CHUNK_HEIGHT = 32
+CHUNK_WIDTH = 64
+
+def chunk_of(pos: tuple[int, int]) -> tuple[int, int]:
+  return pos[0] // CHUNK_HEIGHT, pos[1] // CHUNK_WIDTH
+
+def file_order(item: GameObject) -> tuple[int, int]:
+  # level files are read top to bottom, left to right.
+  return -item.position[0], item.position[1]
+
+class ChunkedWorld(object):
+  # how many chunks away from the player's chunk are awake, as (rows, columns).
+  # a 2x4 radius keeps at least 64 rows and 256 columns around the player
+  # awake, which is more than fits on screen and all of any hand-made level.
+  ACTIVE_RADIUS = (2, 4)
+
+  def __init__(self, actor_table: list[tuple[str, tuple[int, int]]], active_radius: tuple[int, int]|None = None,
+               stream=None):
+    self.active_radius = active_radius if active_radius is not None else ChunkedWorld.ACTIVE_RADIUS
+    self.__specs: dict[tuple[int, int], list[tuple[str, tuple[int, int]]]] = {}
+    self.__stream = stream
+    self.__player_start: tuple[int, int]|None = stream.player_start if stream is not None else None
+    for ch, pos in actor_table:
+      self.__specs.setdefault(chunk_of(pos), []).append((ch, pos))
+      if self.__player_start is None and GAME_OBJECT_FACTORIES.get(ch) is Player:
+        self.__player_start = pos
+    # chunks whose specs have been made into objects.
+    self.__built: set[tuple[int, int]] = set()
+    self.__parked: dict[tuple[int, int], tuple[tuple[GameObject, tuple], ...]] = {}
+    self.__center: tuple[int, int]|None = None
+    self.__active: frozenset[tuple[int, int]] = frozenset()
+
+  def is_active(self, chunk: tuple[int, int]) -> bool:
+    return chunk in self.__active
+
+  def parked_count(self) -> int:
+    return sum(len(parked) for parked in self.__parked.values())
+
+  def unbuilt_count(self) -> int:
+    return sum(len(specs) for chunk, specs in self.__specs.items() if chunk not in self.__built)
+
+  def initial_items(self) -> list[GameObject]:
+    # makes the actors in the chunks around where the player starts, in the
+    # same order a fully loaded level would have them.
+    self.__center = chunk_of(self.__player_start if self.__player_start is not None else (0, 0))
+    self.__active = self.__chunks_around(self.__center)
+    self.__read(self.__center)
+    items = []
+    for chunk in sorted(self.__active):
+      items.extend(self.__build(chunk))
+    items.sort(key=file_order)
+    return items
+
+  def update(self, game) -> None:
+    # called after every tick. moves the active area along with the player.
+    woken = []
+    center = chunk_of(game.player.position)
+    if center != self.__center:
+      active = self.__chunks_around(center)
+      woken = sorted(active - self.__active)
+      self.__center = center
+      self.__active = active
+      self.__read(center)
+
+    leaving: dict[tuple[int, int], list[GameObject]] = {}
+    for item in game.items:
+      chunk = chunk_of(item.position)
+      if chunk not in self.__active and item is not game.player:
+        leaving.setdefault(chunk, []).append(item)
+    if leaving:
+      game.suspend_items([item for items in leaving.values() for item in items])
+      for chunk, items in leaving.items():
+        self.__parked[chunk] = self.__parked.get(chunk, ()) + tuple((item, item.snapshot_state()) for item in items)
+
+    for chunk in woken:
+      if chunk not in self.__built:
+        for item in self.__build(chunk):
+          game.add_item(item)
+      for item, state in self.__parked.pop(chunk, ()):
+        item.restore_state(state)
+        game.resume_item(item)
+
+  def snapshot(self) -> tuple:
+    # the parked tuples never change once made, so they can be shared.
+    return self.__center, self.__active, frozenset(self.__built), dict(self.__parked)
+
+  def restore(self, snapshot: tuple) -> None:
+    center, active, built, parked = snapshot
+    self.__center = center
+    self.__active = active
+    self.__built = set(built)
+    self.__parked = dict(parked)
+
+  def __read(self, center: tuple[int, int]) -> None:
+    # reads one chunk past the active ones all the way around, so anything at
+    # the edge of the active area still runs into the bricks beyond it.
+    if self.__stream is None:
+      return
+    rows, cols = self.active_radius
+    for chunk in sorted(self.__chunks_around(center, (rows + 1, cols + 1))):
+      for ch, pos in self.__stream.read_chunk(chunk):
+        self.__specs.setdefault(chunk_of(pos), []).append((ch, pos))
+
+  def __chunks_around(self, center: tuple[int, int], radius: tuple[int, int]|None = None) -> frozenset[tuple[int, int]]:
+    rows, cols = radius if radius is not None else self.active_radius
+    return frozenset((center[0] + dy, center[1] + dx)
+                     for dy in range(-rows, rows + 1) for dx in range(-cols, cols + 1))
+
+  def __build(self, chunk: tuple[int, int]) -> list[GameObject]:
+    self.__built.add(chunk)
+    return build_actors(self.__specs.get(chunk, []))
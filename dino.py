@@ -5,6 +5,8 @@ import threading
 import random
 import os
 import json
+from frame_commit import FrameCommitter
+from game_loop import GameLoop
 
 class SavedState(object):
   VERSION = 1
@@ -186,6 +188,7 @@ class Game(object):
     self.points: int = 0
     self.lock: threading.Lock = threading.Lock()
     self.saved_state: SavedState = SavedState()
+    self.new_high_score: bool = False
     for i in range(curses.COLS-1 - Game.DINO_POS - 1):
       self.next_n_columns.append(self.next_up())
 
@@ -239,26 +242,48 @@ class Game(object):
 
     return True
 
-  def refresh_window(self, stdscr):
+  def step(self) -> bool:
+    # advances the game one tick. returns False once the game is over.
     try:
       self.acquire_lock()
 
       if self.game_over():
+        return False
+
+      if self.game_state == Game.PAUSED:
+        return True
+
+      if not self.tick():
+        self.new_high_score = self.saved_state.maybe_update_high_score(self.points)
+        return False
+      return True
+    finally:
+      self.release_lock()
+
+  def draw(self, stdscr, frame: FrameCommitter):
+    try:
+      self.acquire_lock()
+
+      if self.game_state == Game.QUIT:
         return
-      
+
       if self.game_state == Game.PAUSED:
         stdscr.addstr(5, 0, "Game paused. Press 'p' to continue.")
-        stdscr.refresh()
-      elif not self.tick():
-        if self.saved_state.maybe_update_high_score(self.points):
+        frame.stage(stdscr)
+        frame.commit()
+        return
+
+      if self.game_state == Game.LOST:
+        if self.new_high_score:
           stdscr.addstr(5, 0, "NEW HIGH SCORE! Press 'e' to exit or press r to restart.")
         else:
           stdscr.addstr(5, 0, "Game over! Press 'e' to exit or press r to restart.")
-
-        stdscr.refresh()
+        frame.stage(stdscr)
+        frame.commit()
         return
       
-      stdscr.clear()
+      # erase() rather than clear(), which would repaint the whole terminal.
+      stdscr.erase()
       
       for i in range(len(self.next_n_columns)):
         self.next_n_columns[i].render(stdscr, i)
@@ -267,16 +292,16 @@ class Game(object):
       stdscr.addstr(0, 0, f"Score: {self.points}")
       stdscr.addstr(1, 0, f"High Score: {self.saved_state.high_score()}")
       stdscr.addstr(2, 0, "Type 'e' to exit, Space to jump, 'm' to mega. 'p' to pause.")
-      stdscr.refresh()
-
-      def task():
-        self.refresh_window(stdscr)
-
-      if not self.game_over():
-        threading.Timer(self.speed(), task).start()
+      frame.stage(stdscr)
+      frame.commit()
     finally:
       self.release_lock()
 
+  def start_loop(self, stdscr, frame: FrameCommitter) -> GameLoop:
+    loop = GameLoop(self.step, lambda: self.draw(stdscr, frame), self.speed)
+    loop.start()
+    return loop
+
   def speed(self):
     return 0.1
   
@@ -298,21 +323,31 @@ class Game(object):
     finally:
       self.release_lock()
 
-def play_game(stdscr):
+def play_game(stdscr) -> bool:
+  # returns True if the player wants to play again.
   stdscr.clear()
 
   game = Game()
-  game.refresh_window(stdscr)
+  frame = FrameCommitter()
+  loop = game.start_loop(frame.count(stdscr), frame)
 
+  play_again = False
   while game.game_state != Game.QUIT:
     k = stdscr.getkey()
     if game.game_over():
       if k == 'r':
-        play_game(stdscr)
+        play_again = True
         break
       elif k == 'e':
         break
     else:
       game.accept_keypress(k)
+  loop.stop()
+  loop.join()
+  return play_again
+
+def play_session(stdscr):
+  while play_game(stdscr):
+    pass
 
-curses.wrapper(play_game)
\ No newline at end of file
+curses.wrapper(play_session)
\ No newline at end of file
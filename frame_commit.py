@@ -0,0 +1,84 @@
+import curses
+
+# every game draws a frame into its curses windows and then sends it to the
+# terminal all at once: stage() each window that changed, which only copies it
+# into curses' picture of the screen (noutrefresh), then commit() flushes that
+# picture with a single doupdate(). one flush per frame means the terminal
+# never shows half a frame.
+#
+# windows wrapped with count() add up how much is written to them, so each
+# frame's cost shows up in stats().
+class FrameCommitter(object):
+  def __init__(self, doupdate=curses.doupdate):
+    # tests and benchmarks without a real terminal pass their own doupdate.
+    self.__doupdate = doupdate
+    self.__staged = 0
+    self.__frame_bytes = 0
+    self.frames = 0
+    self.flushes = 0
+    self.bytes_queued = 0
+    self.last_frame_bytes = 0
+    self.max_frame_bytes = 0
+
+  def count(self, win) -> "CountingWindow":
+    return CountingWindow(win, self)
+
+  def queued(self, nbytes: int) -> None:
+    self.__frame_bytes += nbytes
+
+  def stage(self, win) -> None:
+    win.noutrefresh()
+    self.__staged += 1
+
+  def commit(self) -> None:
+    # ends the frame. if nothing was staged there's nothing to flush.
+    if self.__staged > 0:
+      self.__doupdate()
+      self.flushes += 1
+    self.frames += 1
+    self.bytes_queued += self.__frame_bytes
+    self.last_frame_bytes = self.__frame_bytes
+    self.max_frame_bytes = max(self.max_frame_bytes, self.__frame_bytes)
+    self.__staged = 0
+    self.__frame_bytes = 0
+
+  def flushes_per_frame(self) -> float:
+    return self.flushes / self.frames if self.frames > 0 else 0.0
+
+  def bytes_per_frame(self) -> float:
+    return self.bytes_queued / self.frames if self.frames > 0 else 0.0
+
+  def stats(self) -> dict:
+    return {
+      "frames": self.frames,
+      "flushes": self.flushes,
+      "flushes_per_frame": self.flushes_per_frame(),
+      "bytes_queued": self.bytes_queued,
+      "bytes_per_frame": self.bytes_per_frame(),
+      "max_frame_bytes": self.max_frame_bytes,
+    }
+
+class CountingWindow(object):
+  # passes everything through to a curses window, counting the bytes of text
+  # written to it. subwindows are counted too.
+  def __init__(self, win, frame: FrameCommitter):
+    self.__win = win
+    self.__frame = frame
+
+  def subwin(self, *args) -> "CountingWindow":
+    return CountingWindow(self.__win.subwin(*args), self.__frame)
+
+  def addch(self, y: int, x: int, ch) -> None:
+    self.__frame.queued(len(ch.encode("utf-8")) if isinstance(ch, str) else 1)
+    self.__win.addch(y, x, ch)
+
+  def addstr(self, y: int, x: int, s: str) -> None:
+    self.__frame.queued(len(s.encode("utf-8")))
+    self.__win.addstr(y, x, s)
+
+  def hline(self, y: int, x: int, ch, n: int) -> None:
+    self.__frame.queued(n)
+    self.__win.hline(y, x, ch, n)
+
+  def __getattr__(self, name):
+    return getattr(self.__win, name)
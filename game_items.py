@@ -8,6 +8,7 @@ import random
 import sys
 import os
 import json
+from typing import Callable
 from buffered_window import BufferedCenterableWindow
 
 def sign(x: int) -> int:
@@ -18,6 +19,8 @@ def sign(x: int) -> int:
   return 0
 
 class InventoryItem(object):
+  __slots__ = ()
+
   def __init__(self):
     pass
 
@@ -27,9 +30,35 @@ class InventoryItem(object):
   def should_be_removed(self) -> bool:
     return False
 
+# the slots that make up each class's state, see GameObject.snapshot_state.
+STATE_SLOTS: dict[type, tuple[str, ...]] = {}
+
+def state_slots(cls: type) -> tuple[str, ...]:
+  # every slot declared by cls and its bases, except the positions cache which
+  # can always be worked out again and the game's removal queue.
+  slots = STATE_SLOTS.get(cls)
+  if slots is None:
+    names = []
+    for klass in reversed(cls.__mro__):
+      for name in klass.__dict__.get("__slots__", ()):
+        if name not in ("_cells", "_cell_set", "_removal_queue"):
+          names.append(name)
+    slots = tuple(names)
+    STATE_SLOTS[cls] = slots
+  return slots
+
 class GameObject(object):
+  __slots__ = ("should_be_removed", "_cells", "_cell_set", "_removal_queue")
+
   def __init__(self):
     self.should_be_removed: bool = False
+    # set by added_to_game. signal_removal_from_game() puts us on it so the
+    # game only has to look for dead objects when there are some.
+    self._removal_queue: list|None = None
+    # positions() is called constantly, so the occupied cells are cached until
+    # invalidate_positions() says they've changed.
+    self._cells: tuple[tuple[int, int], ...]|None = None
+    self._cell_set: frozenset[tuple[int, int]]|None = None
 
   def addch(self, stdscr: BufferedCenterableWindow, pos: tuple[int, int], ch: str) -> None:
     stdscr.addch(pos[0], pos[1], ch)
@@ -42,9 +71,31 @@ class GameObject(object):
     for ch, i in zip(s, range(len(s))):
       self.addch(stdscr, (pos[0] + (len(s) - 1) - i, pos[1]), ch)
 
+  def added_to_game(self, game) -> None:
+    # called once the object is in a game. anything random should come from
+    # game.rng, here or in tick(), so a run can be replayed.
+    self._removal_queue = game.removal_queue
+
   def tick(self, game) -> None:
     pass
 
+  def positions(self) -> tuple[tuple[int, int], ...]:
+    if self._cells is None:
+      self._cells = tuple(self.compute_positions())
+    return self._cells
+
+  def position_set(self) -> frozenset[tuple[int, int]]:
+    if self._cell_set is None:
+      self._cell_set = frozenset(self.positions())
+    return self._cell_set
+
+  def compute_positions(self) -> list[tuple[int, int]]:
+    return []
+
+  def invalidate_positions(self) -> None:
+    self._cells = None
+    self._cell_set = None
+
   def render(self, stdscr: BufferedCenterableWindow) -> None:
     pass
 
@@ -55,7 +106,11 @@ class GameObject(object):
     return False
   
   def signal_removal_from_game(self):
+    if self.should_be_removed:
+      return
     self.should_be_removed = True
+    if self._removal_queue is not None:
+      self._removal_queue.append(self)
   
   def should_be_removed_from_game(self) -> bool:
     return self.should_be_removed
@@ -69,13 +124,40 @@ class GameObject(object):
   def accept_item(self, item: InventoryItem) -> None:
     pass
 
+  def is_static(self) -> bool:
+    # static objects never move, tick or get removed, so the level loader can
+    # fold them into the level's StaticLayer instead of keeping them around.
+    return False
+
+  def snapshot_state(self) -> tuple:
+    # a flat tuple of our slots. the values are shared, not copied, so anything
+    # mutable has to be copied by the subclass (see Player).
+    return tuple([getattr(self, name) for name in state_slots(type(self))])
+
+  def restore_state(self, state: tuple) -> None:
+    for name, value in zip(state_slots(type(self)), state):
+      setattr(self, name, value)
+    self.invalidate_positions()
+
 
 class MovableObject(GameObject):
+  __slots__ = ("_position", "velocity")
+
   def __init__(self, position: tuple[int, int], velocity: tuple[int, int]):
     super().__init__()
-    self.position = position
+    self._position = position
     self.velocity = velocity
 
+  @property
+  def position(self) -> tuple[int, int]:
+    return self._position
+
+  @position.setter
+  def position(self, position: tuple[int, int]) -> None:
+    if position != self._position:
+      self._position = position
+      self.invalidate_positions()
+
   def adjust_velocity(self, new_abs_x: int|None=None, new_abs_y: int|None=None, relative_x: int|None=None, relative_y: int|None=None):
     if new_abs_y is not None:
       self.velocity = (new_abs_y, self.velocity[1])
@@ -100,28 +182,50 @@ class MovableObject(GameObject):
     return False
 
   def tick(self, game) -> None:
+    if self.velocity != (0, 0):
+      self.move(game)
+
+    if self.experiences_gravity():
+      self.apply_gravity(game)
+
+  def sweep(self) -> list[tuple[tuple[int, int], list[tuple[int, int]]]]:
+    # the unit steps we take to cover our velocity, as (position, cells) pairs.
+    # not quite perfect because if we need to do (3,1) then we'll do (1,1) then (1,0) and (1,0) which
+    # may be a little wrong sometimes.
+    steps = []
     remaining_velocity: tuple[int, int] = self.velocity
-    while abs(remaining_velocity[0]) > 0 or abs(remaining_velocity[1]) > 0:
-      # not quite perfect because if we need to do (3,1) then we'll do (1,1) then (1,0) and (1,0) which
-      # may be a little wrong sometimes.
+    position = self._position
+    while remaining_velocity[0] != 0 or remaining_velocity[1] != 0:
       y_movement: int = sign(remaining_velocity[0])
       x_movement: int = sign(remaining_velocity[1])
-      remaining_velocity: tuple[int, int] = (remaining_velocity[0] - y_movement, remaining_velocity[1] - x_movement)
-
-      next_position = self.position[0] + y_movement, self.position[1] + x_movement
-      other_items = game.items_at(self.positions(start_pos=next_position))
-      if len(other_items) == 0 or other_items == [self]:
+      remaining_velocity = (remaining_velocity[0] - y_movement, remaining_velocity[1] - x_movement)
+      position = (position[0] + y_movement, position[1] + x_movement)
+      steps.append((position, self.compute_positions(start_pos=position)))
+    return steps
+
+  def move(self, game) -> None:
+    # ask the game once for everything along our whole path, then walk the
+    # path step by step against just those objects and stop at the first step
+    # that runs into something.
+    steps = self.sweep()
+    path = []
+    for _, cells in steps:
+      path.extend(cells)
+    candidates = [item for item in game.items_at(path) if item is not self]
+
+    start_position = self._position
+    for next_position, cells in steps:
+      other_items = [item for item in candidates if not item.position_set().isdisjoint(cells)]
+      if len(other_items) == 0:
         self.position = next_position
-      else:
-        for other_item in other_items:
-          if self == other_item:
-            continue
-          self.collide(other_item)
-          other_item.collide(self)
-        remaining_velocity = (0, 0)
-  
-    if self.experiences_gravity():
-      self.apply_gravity(game)
+        continue
+      for other_item in other_items:
+        self.collide(other_item)
+        other_item.collide(self)
+      break
+
+    if self._position != start_position:
+      game.item_moved(self)
 
   def apply_gravity(self, game):
     # if nothing is below our lowest point, then we should fall.
@@ -133,9 +237,18 @@ class MovableObject(GameObject):
       # there's something below us, we can't fall.
       self.adjust_velocity(new_abs_y=0)
 
-  def positions(self, start_pos=None) -> list[tuple[int, int]]:
+  def positions(self, start_pos=None) -> tuple[tuple[int, int], ...]:
+    if start_pos is not None:
+      return tuple(self.compute_positions(start_pos))
+    # the cache is also stale if our height changed.
+    if self._cells is None or len(self._cells) != len(self.chars()):
+      self._cells = tuple(self.compute_positions())
+      self._cell_set = None
+    return self._cells
+
+  def compute_positions(self, start_pos=None) -> list[tuple[int, int]]:
     ret = []
-    pos = start_pos if start_pos is not None else self.position
+    pos = start_pos if start_pos is not None else self._position
     for h in range(len(self.chars())):
       ret.append((pos[0] + h, pos[1]))
     return ret
@@ -168,6 +281,8 @@ class MovableObject(GameObject):
       self.adjust_velocity(new_abs_x=0)
 
 class LittleBadGuy(MovableObject):
+  __slots__ = ("last_reversal",)
+
   def __init__(self, initial_pos):
     super().__init__(initial_pos, (0, -1))
     self.last_reversal = 0
@@ -181,7 +296,7 @@ class LittleBadGuy(MovableObject):
     if self.last_reversal > 10:
       self.last_reversal = 0
       if self.velocity == (0,0):
-        self.velocity = (0, random.choice([-1, 1]))
+        self.velocity = (0, game.rng.choice([-1, 1]))
       else:
         self.velocity = (self.velocity[0], -1 * self.velocity[1])
 
@@ -192,6 +307,8 @@ class LittleBadGuy(MovableObject):
     return isinstance(other_object, Player)
 
 class ShootsFireballs(InventoryItem):
+  __slots__ = ("tick_counter",)
+
   def __init__(self):
     self.tick_counter = 0
 
@@ -203,9 +320,11 @@ class ShootsFireballs(InventoryItem):
     if v[1] == 0:
       v = v[0], 1
     for i in range(len(shooter.chars())):
-      game.add_item(Fireball((shooter.position[0]+i, shooter.position[1] + offset), v, 20, immune=shooter))
+      game.add_item(game.projectiles.acquire(Fireball, (shooter.position[0]+i, shooter.position[1] + offset), v, 20, immune=shooter))
 
 class BigBadGuy(MovableObject):
+  __slots__ = ("fireball_shooter",)
+
   def __init__(self, initial_pos):
     super().__init__(initial_pos, (0, 1))
     self.fireball_shooter = ShootsFireballs()
@@ -224,6 +343,8 @@ class BigBadGuy(MovableObject):
 
 
 class Bird(MovableObject):
+  __slots__ = ("last_reversal", "flap_indicator")
+
   def __init__(self, initial_pos):
     super().__init__(initial_pos, (0, -1))
     self.last_reversal = 0
@@ -234,13 +355,13 @@ class Bird(MovableObject):
 
   def tick(self, game):
     super().tick(game)
+    self.flap_indicator = (self.flap_indicator + 1) % 10
     self.last_reversal += 1
     if self.last_reversal > 10:
       self.last_reversal = 0
       self.velocity = (self.velocity[0], -1 * self.velocity[1])
 
   def chars(self):
-    self.flap_indicator = (self.flap_indicator + 1) % 10
     if self.flap_indicator < 5:
       return "W"
     else:
@@ -251,11 +372,13 @@ class Bird(MovableObject):
 
 class Player(MovableObject):
   CHARS = "MM"
+  __slots__ = ("is_dead", "items", "is_little")
 
   def __init__(self, pos):
     super().__init__(pos, (0, 0))
 
     self.is_dead = False
+    self.is_little = True
     self.items = []
 
   def experiences_gravity(self):
@@ -303,6 +426,13 @@ class Player(MovableObject):
 
   def accept_item(self, item: InventoryItem) -> None:
     self.items.append(item)
+
+  def snapshot_state(self) -> tuple:
+    return (super().snapshot_state(), tuple(self.items))
+
+  def restore_state(self, state: tuple) -> None:
+    super().restore_state(state[0])
+    self.items = list(state[1])
  
   def collide(self, other_object):
     super().collide(other_object)
@@ -310,6 +440,8 @@ class Player(MovableObject):
       self.is_little = False
 
 class SpeedBoost(InventoryItem):
+  __slots__ = ("start_time", "duration")
+
   def __init__(self):
     self.start_time = time.time()
     self.duration = 30
@@ -320,11 +452,13 @@ class SpeedBoost(InventoryItem):
     return False
 
 class Edamame(GameObject):
+  __slots__ = ("position",)
+
   def __init__(self, pos):
     super().__init__()
     self.position = pos
 
-  def positions(self):
+  def compute_positions(self):
     return [self.position]
 
   def render(self, stdscr: BufferedCenterableWindow):
@@ -338,12 +472,14 @@ class Edamame(GameObject):
     return SpeedBoost()
 
 class ItemHolder(GameObject):
+  __slots__ = ("position", "item")
+
   def __init__(self, pos, item):
     super().__init__()
     self.position = pos
     self.item = item
 
-  def positions(self):
+  def compute_positions(self):
     return [self.position]
 
   def render(self, stdscr: BufferedCenterableWindow):
@@ -359,17 +495,24 @@ class ItemHolder(GameObject):
 
 
 class Brick(GameObject):
+  __slots__ = ("position",)
+
   def __init__(self, pos):
     super().__init__()
     self.position = pos
 
-  def positions(self):
+  def compute_positions(self):
     return [self.position]
 
   def render(self, stdscr: BufferedCenterableWindow):
     self.addch(stdscr, self.position, "=")
 
+  def is_static(self) -> bool:
+    return True
+
 class BreakableBrick(GameObject):
+  __slots__ = ("position", "chars", "brokenness", "disappear")
+
   def __init__(self, pos):
     super().__init__()
     self.position = pos
@@ -377,7 +520,7 @@ class BreakableBrick(GameObject):
     self.brokenness = 0
     self.disappear = 0
 
-  def positions(self):
+  def compute_positions(self):
     return [self.position]
   
   def collide(self, other_object):
@@ -395,14 +538,21 @@ class BreakableBrick(GameObject):
       self.addch(stdscr, self.position, "-")
 
 class Fire(GameObject):# there should be a special fire
+  __slots__ = ("position", "size_indicator", "num_fire")
+
   def __init__(self, pos):
     super().__init__()
     self.position = pos
-    self.size_indicator = random.randint(0, 10)
+    self.size_indicator = 0
     self.num_fire = 1
 
+  def added_to_game(self, game):
+    super().added_to_game(game)
+    self.size_indicator = game.rng.randint(0, 10)
+
   def tick(self, game):
     super().tick(game)
+    num_fire = self.num_fire
     self.size_indicator = (self.size_indicator + 1) % 20
     if self.size_indicator > 15:
       self.num_fire = 2
@@ -410,8 +560,10 @@ class Fire(GameObject):# there should be a special fire
       self.num_fire = 1
     else:
       self.num_fire = 0  
+    if self.num_fire != num_fire:
+      self.invalidate_positions()
 
-  def positions(self):
+  def compute_positions(self):
     ret = []
     for i in range(self.num_fire):
       ret.append((self.position[0] + i, self.position[1]))
@@ -424,12 +576,14 @@ class Fire(GameObject):# there should be a special fire
     return isinstance(other_object, Player) or isinstance(other_object, LittleBadGuy) or isinstance(other_object, BigBadGuy)
 
 class Tree(GameObject):
+  __slots__ = ("position", "chars")
+
   def __init__(self, pos):
     super().__init__()
     self.position = pos
     self.chars = "TTT"
 
-  def positions(self):
+  def compute_positions(self):
     ret = []
     for i in range(len(self.chars)):
       ret.append((self.position[0] + i, self.position[1]))
@@ -442,13 +596,15 @@ class Tree(GameObject):
     return isinstance(other_object, Player)
 
 class EndingFlag(GameObject):
+  __slots__ = ("position", "had_collision", "chars")
+
   def __init__(self, pos):
     super().__init__()
     self.position = pos
     self.had_collision = False
     self.chars = "WINHERE"
 
-  def positions(self):
+  def compute_positions(self):
     ret = []
     for i in range(len(self.chars)):
       ret.append((self.position[0] + i, self.position[1]))
@@ -461,7 +617,54 @@ class EndingFlag(GameObject):
     if isinstance(other_object, Player):
       self.had_collision = True
 
-class Fireball(MovableObject):
+class Projectile(MovableObject):
+  # fireballs and cannonballs. there can be hundreds in flight at once, and
+  # they take up a single cell and almost always fly through empty space, so
+  # tick() first checks their path cell by cell against the static layer and
+  # the index and only goes through items_at() and collide() when something's
+  # actually there.
+  __slots__ = ()
+
+  def tick(self, game):
+    if self.velocity != (0, 0) and not self.move_if_clear(game):
+      self.move(game)
+
+    if not self.experiences_gravity():
+      return
+    y, x = self._position
+    if game.is_empty((y - 1, x)):
+      self.adjust_velocity(relative_y=-1)
+    elif self.velocity[0] < 0:
+      # landing. resting on something needs nothing at all.
+      self.apply_gravity(game)
+    if y < 0 and self.velocity[0] <= 0:
+      # below the bottom of the level and still falling, so there's nothing
+      # left to hit and it can never be on screen again.
+      self.signal_removal_from_game()
+
+  def move_if_clear(self, game) -> bool:
+    # moves the whole way and returns True if every cell on the way is empty.
+    # otherwise changes nothing and returns False.
+    vy, vx = self.velocity
+    y, x = self._position
+    step_y = sign(vy)
+    step_x = sign(vx)
+    while vy != 0 or vx != 0:
+      if vy != 0:
+        y += step_y
+        vy -= step_y
+      if vx != 0:
+        x += step_x
+        vx -= step_x
+      if not game.is_empty((y, x)):
+        return False
+    self.position = (y, x)
+    game.item_moved(self)
+    return True
+
+class Fireball(Projectile):
+  __slots__ = ("lifetime", "immune")
+
   def __init__(self, pos, velocity, lifetime: int, immune=None):
     super().__init__(pos, velocity)
     self.lifetime = lifetime
@@ -492,15 +695,14 @@ class Fireball(MovableObject):
               other_object != self.immune
             )
 
-class Cannonball(MovableObject):
+class Cannonball(Projectile):
+  __slots__ = ()
+
   def __init__(self, pos, velocity):
     super().__init__(pos, velocity)
 
   def chars(self) -> str:
     return "O"
-  
-  def tick(self, game):
-    super().tick(game)
 
   def experiences_gravity(self):
     return True
@@ -509,6 +711,8 @@ class Cannonball(MovableObject):
     return isinstance(other_object, Player)
 
 class Cannon(GameObject):
+  __slots__ = ("position", "chars", "tick_counter", "direction")
+
   def __init__(self, pos, ch, direction):
     super().__init__()
     self.position = pos
@@ -516,7 +720,7 @@ class Cannon(GameObject):
     self.tick_counter = 0
     self.direction = direction
 
-  def positions(self):
+  def compute_positions(self):
     ret = []
     for i in range(len(self.chars)):
       ret.append((self.position[0] + i, self.position[1]))
@@ -526,12 +730,14 @@ class Cannon(GameObject):
     super().tick(game)
     self.tick_counter += 1
     if self.tick_counter % 10 == 0:
-      game.add_item(Cannonball((self.position[0] + self.direction[0], self.position[1] + self.direction[1]), (self.direction[0]*2, self.direction[1]*2)))
+      game.add_item(game.projectiles.acquire(Cannonball, (self.position[0] + self.direction[0], self.position[1] + self.direction[1]), (self.direction[0]*2, self.direction[1]*2)))
 
   def render(self, stdscr: BufferedCenterableWindow):
     self.addch(stdscr, self.position, self.chars)
 
 class Fireline(GameObject):
+  __slots__ = ("position", "fireball_placement", "fireball_v", "tick_counter")
+
   def __init__(self, pos):
     super().__init__()
     self.position = pos
@@ -539,31 +745,32 @@ class Fireline(GameObject):
     self.fireball_v = None
     self.tick_counter = 0
 
-  def positions(self):
-    if 0 <= self.tick_counter < 5:
-      self.fireball_placement = None
-      self.fireball_v = None
-      return [(self.position[0] + ydelta, self.position[1]) for ydelta in range(-5, 5, 1)]
-    elif 5 <= self.tick_counter < 10:
-      self.fireball_placement = (self.position[0] + 5, self.position[1] + 5)
-      self.fireball_v = (1, 2)
-      return [(self.position[0] + ydelta, self.position[1] + ydelta) for ydelta in range(-5, 5, 1)]
-    elif 10 < self.tick_counter < 15:
-      self.fireball_placement = None
-      self.fireball_v = None
-      return [(self.position[0] + ydelta, self.position[1]) for ydelta in range(-5, 5, 1)]
-    else: # if 15 <= self.tick_counter < 20:
-      self.fireball_v = (1, -2)
-      self.fireball_placement = (self.position[0] + 5, self.position[1] - 5)
-      return [(self.position[0] + ydelta, self.position[1] - ydelta) for ydelta in range(-5, 5, 1)]
+  def shape(self, tick_counter: int):
+    # returns (positions, fireball placement, fireball velocity) for where we
+    # are in the cycle.
+    if 0 <= tick_counter < 5:
+      return [(self.position[0] + ydelta, self.position[1]) for ydelta in range(-5, 5, 1)], None, None
+    elif 5 <= tick_counter < 10:
+      return ([(self.position[0] + ydelta, self.position[1] + ydelta) for ydelta in range(-5, 5, 1)],
+              (self.position[0] + 5, self.position[1] + 5), (1, 2))
+    elif 10 < tick_counter < 15:
+      return [(self.position[0] + ydelta, self.position[1]) for ydelta in range(-5, 5, 1)], None, None
+    else: # if 15 <= tick_counter < 20:
+      return ([(self.position[0] + ydelta, self.position[1] - ydelta) for ydelta in range(-5, 5, 1)],
+              (self.position[0] + 5, self.position[1] - 5), (1, -2))
+
+  def compute_positions(self):
+    return self.shape(self.tick_counter)[0]
 
   def tick(self, game):
     super().tick(game)
+    _, self.fireball_placement, self.fireball_v = self.shape(self.tick_counter)
     self.tick_counter += 1
     if self.tick_counter % 10 == 7 and self.fireball_placement is not None:
-      game.add_item(Fireball(self.fireball_placement, self.fireball_v, 10))
+      game.add_item(game.projectiles.acquire(Fireball, self.fireball_placement, self.fireball_v, 10))
     if self.tick_counter == 20:
       self.tick_counter = 0
+    self.invalidate_positions()
 
   def render(self, stdscr: BufferedCenterableWindow):
     for position in self.positions():
@@ -572,36 +779,52 @@ class Fireline(GameObject):
   def kills_on_collision(self, other_object) -> bool:
     return isinstance(other_object, Player) or isinstance(other_object, LittleBadGuy) or isinstance(other_object, BigBadGuy)
 
+# maps a level character to the function that makes the object for that tile.
+# plugins can add their own tile types with register_game_object().
+GAME_OBJECT_FACTORIES: dict[str, Callable[[tuple[int, int]], GameObject|None]] = {}
+# tiles whose objects are static (see GameObject.is_static) and take up just
+# their own cell, so the loader can put them in the StaticLayer without making
+# an object at all.
+STATIC_TILES: set[str] = set()
+
+def register_game_object(ch: str, factory: Callable[[tuple[int, int]], GameObject|None],
+                         static: bool = False, replace: bool = False) -> None:
+  if ch in GAME_OBJECT_FACTORIES and not replace:
+    raise ValueError(f"{ch!r} is already registered")
+  GAME_OBJECT_FACTORIES[ch] = factory
+  if static:
+    STATIC_TILES.add(ch)
+  else:
+    STATIC_TILES.discard(ch)
+
+def is_static_tile(ch: str) -> bool:
+  return ch in STATIC_TILES
+
 def get_game_object_for_name(ch: str, game_pos: tuple[int, int]) -> GameObject|None:
-  if ch == " ":
+  factory = GAME_OBJECT_FACTORIES.get(ch)
+  if factory is None:
     return None
-  elif ch == "=":
-    return Brick(game_pos)
-  elif ch == "+":
-    return BreakableBrick(game_pos)
-  elif ch == "P":
-    return Player(game_pos)
-  elif ch == "E":
-    return Edamame(game_pos)
-  elif ch == "b":
-    return LittleBadGuy(game_pos)
-  elif ch == "B":
-    return BigBadGuy(game_pos)
-  elif ch == "F":
-    return EndingFlag(game_pos)
-  elif ch == "T":
-    return Tree(game_pos)
-  elif ch == "W":
-    return Bird(game_pos)
-  elif ch == "🔥":
-    return Fire(game_pos)
-  elif ch == "L":
-    return Fireline(game_pos)
-  elif ch == "H":
-    return ItemHolder(game_pos, ShootsFireballs())
-  elif ch == "/":
-    return Cannon(game_pos, ch, direction=(1,1))
-  elif ch == "\\":
-    return Cannon(game_pos, ch, direction=(1,-1))
-  
-  return None
\ No newline at end of file
+  return factory(game_pos)
+
+def build_game_objects(ch: str, positions: list[tuple[int, int]]) -> list[GameObject|None]:
+  # makes every object for one tile type in one go. the result lines up with
+  # positions, so it has a None wherever the factory didn't make anything.
+  factory = GAME_OBJECT_FACTORIES.get(ch)
+  if factory is None:
+    return [None] * len(positions)
+  return [factory(pos) for pos in positions]
+
+register_game_object("=", Brick, static=True)
+register_game_object("+", BreakableBrick)
+register_game_object("P", Player)
+register_game_object("E", Edamame)
+register_game_object("b", LittleBadGuy)
+register_game_object("B", BigBadGuy)
+register_game_object("F", EndingFlag)
+register_game_object("T", Tree)
+register_game_object("W", Bird)
+register_game_object("🔥", Fire)
+register_game_object("L", Fireline)
+register_game_object("H", lambda pos: ItemHolder(pos, ShootsFireballs()))
+register_game_object("/", lambda pos: Cannon(pos, "/", direction=(1,1)))
+register_game_object("\\", lambda pos: Cannon(pos, "\\", direction=(1,-1)))
@@ -0,0 +1,75 @@
+import threading
+import time
+
+# drives a game from one long-lived thread instead of starting a new
+# threading.Timer for every frame.
+#
+# the simulation runs at a fixed timestep: time that passes is added to an
+# accumulator and we tick once for every whole timestep in it, so a slow frame
+# is caught up on by ticking more than once instead of slowing the game down.
+# rendering happens at its own rate, after any ticks that were due.
+class GameLoop(object):
+  # never tick more than this many times before drawing, otherwise a long
+  # stall (like a suspended terminal) would make the game fast-forward.
+  MAX_TICKS_PER_FRAME = 5
+
+  def __init__(self, tick, render, timestep, render_interval: float|None=None):
+    # tick() advances the game one step and returns False once it's over.
+    # render() draws the current state.
+    # timestep() returns the seconds per tick; it's a function because games
+    # change their speed as they go.
+    # render_interval is the seconds between frames when nothing ticked,
+    # defaulting to the timestep.
+    self.__tick = tick
+    self.__render = render
+    self.__timestep = timestep
+    self.__render_interval = render_interval
+    self.__stopped = threading.Event()
+    self.__thread = threading.Thread(target=self.__run, daemon=True)
+
+  def start(self) -> None:
+    self.__thread.start()
+
+  def stop(self) -> None:
+    self.__stopped.set()
+
+  def join(self, timeout: float|None=None) -> None:
+    if self.__thread.is_alive() and self.__thread is not threading.current_thread():
+      self.__thread.join(timeout)
+
+  def is_running(self) -> bool:
+    return self.__thread.is_alive()
+
+  def __run(self) -> None:
+    previous = time.monotonic()
+    # start with one tick's worth of time so the first tick happens right away.
+    accumulator = self.__timestep()
+    last_render = None
+    running = True
+    while running and not self.__stopped.is_set():
+      now = time.monotonic()
+      accumulator += now - previous
+      previous = now
+
+      ticks = 0
+      timestep = self.__timestep()
+      while accumulator >= timestep and ticks < GameLoop.MAX_TICKS_PER_FRAME:
+        accumulator -= timestep
+        ticks += 1
+        if not self.__tick():
+          running = False
+          break
+        timestep = self.__timestep()
+      if ticks == GameLoop.MAX_TICKS_PER_FRAME:
+        # we fell too far behind, drop the backlog.
+        accumulator = min(accumulator, timestep)
+
+      render_interval = self.__render_interval if self.__render_interval is not None else timestep
+      if ticks > 0 or last_render is None or now - last_render >= render_interval:
+        self.__render()
+        last_render = now
+
+      if running:
+        until_tick = timestep - accumulator
+        until_render = last_render + render_interval - time.monotonic()
+        self.__stopped.wait(max(0.0, min(until_tick, until_render)))
@@ -0,0 +1,157 @@
+#!/Users/nsanch/kids-project/.venv/bin/python
+
+# runs side-scroller levels without a terminal, as fast as possible.
+#
+#   ./headless.py --level 9 --ticks 5000 --inputs "3:KEY_RIGHT,10:SPACE,12:f"
+#
+# inputs are "tick:key" pairs, where key is anything Game.accept_keypress
+# understands ("SPACE" stands in for " "). they can also come from a file with
+# one "tick key" pair per line.
+#
+# a game recorded with ./side-scroller.py --record plays back exactly with
+#
+#   ./headless.py --replay traces/level9-1760000000000.trace
+#
+# --stream reads the level file a chunk at a time as the player gets near each
+# part of it instead of compiling all of it first, for huge levels.
+
+import argparse
+import sys
+import time
+from input_trace import InputTrace, RESTART
+from level_cache import compile_level
+from level_stream import LevelStream
+from side_scroller_game import Game, level_path, new_game, stream_game
+
+STATE_NAMES = {
+  Game.RUNNING: "running",
+  Game.PAUSED: "paused",
+  Game.LOST: "lost",
+  Game.QUIT: "quit",
+  Game.WON: "won",
+  Game.WAITING_FOR_NEXT_LEVEL: "waiting for next level",
+}
+
+def parse_key(key: str) -> str:
+  return " " if key == "SPACE" else key
+
+def parse_inputs(script: str) -> dict[int, list[str]]:
+  inputs: dict[int, list[str]] = {}
+  for entry in script.split(","):
+    entry = entry.strip()
+    if entry == "":
+      continue
+    tick, key = entry.split(":", 1)
+    inputs.setdefault(int(tick), []).append(parse_key(key))
+  return inputs
+
+def read_inputs(fname: str) -> dict[int, list[str]]:
+  inputs: dict[int, list[str]] = {}
+  with open(fname) as f:
+    for line in f:
+      line = line.strip()
+      if line == "" or line.startswith("#"):
+        continue
+      tick, key = line.split(None, 1)
+      inputs.setdefault(int(tick), []).append(parse_key(key))
+  return inputs
+
+class HeadlessResult(object):
+  def __init__(self, game: Game, ticks: int, elapsed: float):
+    self.game = game
+    self.ticks = ticks
+    self.elapsed = elapsed
+
+  def ticks_per_second(self) -> float:
+    if self.elapsed == 0:
+      return float("inf")
+    return self.ticks / self.elapsed
+
+  def summary(self) -> str:
+    summary = (f"level {self.game.level}: {STATE_NAMES[self.game.game_state]} after {self.ticks} ticks, "
+               f"player at {self.game.player.position}, {len(self.game.items)} actors, "
+               f"{self.elapsed:.3f}s ({self.ticks_per_second():.0f} ticks/s)")
+    pool = self.game.projectiles.stats()
+    if pool["acquired"] > 0:
+      peaks = ", ".join(f"{name} {n}" for name, n in pool["peak_in_flight"].items())
+      summary += (f"\nprojectiles: {pool['acquired']} fired, {pool['hit_rate']:.0%} reused, "
+                  f"{pool['free']} pooled, peak in flight {peaks}")
+    return summary
+
+def run_headless(game: Game, ticks: int, inputs: dict[int, list[str]]|None=None) -> HeadlessResult:
+  # inputs[n] are the keys pressed right before the nth tick.
+  inputs = inputs if inputs is not None else {}
+  ticks_run = 0
+  start = time.perf_counter()
+  while ticks_run < ticks and not game.game_over():
+    for k in inputs.get(ticks_run, []):
+      game.accept_keypress(k, None)
+    game.step()
+    ticks_run += 1
+  return HeadlessResult(game, ticks_run, time.perf_counter() - start)
+
+def replay(game: Game, trace: InputTrace) -> HeadlessResult:
+  # presses each key after the same number of steps as when it was recorded.
+  start = time.perf_counter()
+  for step, key in trace.keys:
+    while game.step_count < step:
+      game.step()
+    if key == RESTART:
+      game.restart()
+    else:
+      game.accept_keypress(key, None)
+  while game.step_count < trace.steps:
+    game.step()
+  return HeadlessResult(game, game.step_count, time.perf_counter() - start)
+
+def load_game(level: int, fname: str|None=None, seed: int|None=None, stream: bool=False) -> Game:
+  fname = fname if fname is not None else level_path(level)
+  if stream:
+    return stream_game(fname, level, seed=seed)
+  return new_game(compile_level(fname)[0], level, seed=seed)
+
+def load_replay(trace: InputTrace, fname: str|None=None, stream: bool=False) -> Game:
+  fname = fname if fname is not None else level_path(trace.level)
+  if stream:
+    digest = LevelStream(fname).digest()
+  else:
+    template = compile_level(fname)[0]
+    digest = template.digest
+  if digest != trace.digest:
+    raise ValueError(f"the trace was recorded on a different version of level {trace.level}")
+  if stream:
+    return stream_game(fname, trace.level, rewind_ticks=trace.rewind_ticks, seed=trace.seed)
+  return new_game(template, trace.level, rewind_ticks=trace.rewind_ticks, seed=trace.seed)
+
+def main(argv: list[str]) -> int:
+  parser = argparse.ArgumentParser(description="Run a side-scroller level without a terminal.")
+  parser.add_argument("--level", type=int, default=1, help="level number to load")
+  parser.add_argument("--file", help="level file to load instead of a numbered level")
+  parser.add_argument("--ticks", type=int, default=1000, help="how many ticks to run")
+  parser.add_argument("--inputs", default="", help='keys to press, like "3:KEY_RIGHT,10:SPACE"')
+  parser.add_argument("--input-file", help="file of 'tick key' lines to press")
+  parser.add_argument("--seed", type=int, help="seed for the game's rng, random if not given")
+  parser.add_argument("--replay", help="trace recorded by ./side-scroller.py --record to play back")
+  parser.add_argument("--stream", action="store_true", help="read the level file as it's played")
+  args = parser.parse_args(argv)
+
+  if args.replay:
+    trace = InputTrace.load(args.replay)
+    try:
+      game = load_replay(trace, args.file, args.stream)
+    except ValueError as e:
+      print(e, file=sys.stderr)
+      return 1
+    print(replay(game, trace).summary())
+    return 0
+
+  inputs = read_inputs(args.input_file) if args.input_file else parse_inputs(args.inputs)
+  start = time.perf_counter()
+  game = load_game(args.level, args.file, args.seed, args.stream)
+  print(f"loaded in {time.perf_counter() - start:.3f}s")
+  result = run_headless(game, args.ticks, inputs)
+  print(result.summary())
+  return 0
+
+if __name__ == "__main__":
+  sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,67 @@
+import struct
+
+# a recording of one side-scroller game: the seed its Game's rng started from,
+# how much rewind history it kept, the level it was played on, and every key
+# that did something, stamped with how many steps the game had taken when it
+# was pressed. pressing the same keys at the same steps in a Game made the same
+# way plays out exactly the same.
+#
+#   header   magic, format version, seed, rewind ticks, level number, digest
+#            of the level (level_cache.level_digest), total steps, number of
+#            keys
+#   keys     one (step, key) entry per key, key being its index in KEYS
+
+# restarts happen outside accept_keypress, so they get a key of their own.
+RESTART = "RESTART"
+
+KEYS = ["p", " ", "KEY_UP", "KEY_DOWN", "KEY_LEFT", "KEY_RIGHT", "f", "s", "e", "z", RESTART]
+KEY_CODES = {key: code for code, key in enumerate(KEYS)}
+
+class InputTrace(object):
+  MAGIC = b"SSIT"
+  VERSION = 1
+  HEADER = struct.Struct("<4sHQIi20sII")
+  KEY = struct.Struct("<IB")
+
+  def __init__(self, seed: int, rewind_ticks: int, level: int, digest: bytes,
+               keys: list[tuple[int, str]]|None = None, steps: int = 0):
+    self.seed = seed
+    self.rewind_ticks = rewind_ticks
+    self.level = level
+    self.digest = digest
+    self.keys = keys if keys is not None else []
+    self.steps = steps
+
+  def record(self, step: int, key: str|None) -> None:
+    # keys the game doesn't understand don't change anything, so they're
+    # left out.
+    if key in KEY_CODES:
+      self.keys.append((step, key))
+
+  def to_bytes(self) -> bytes:
+    header = InputTrace.HEADER.pack(InputTrace.MAGIC, InputTrace.VERSION, self.seed, self.rewind_ticks, self.level,
+                                    self.digest, self.steps, len(self.keys))
+    return header + b"".join(InputTrace.KEY.pack(step, KEY_CODES[key]) for step, key in self.keys)
+
+  @staticmethod
+  def from_bytes(data: bytes) -> "InputTrace":
+    if len(data) < InputTrace.HEADER.size:
+      raise ValueError("not an input trace")
+    magic, version, seed, rewind_ticks, level, digest, steps, key_count = InputTrace.HEADER.unpack_from(data, 0)
+    if magic != InputTrace.MAGIC:
+      raise ValueError("not an input trace")
+    if version != InputTrace.VERSION:
+      raise ValueError(f"input trace version {version} isn't supported")
+    if len(data) != InputTrace.HEADER.size + key_count * InputTrace.KEY.size:
+      raise ValueError("input trace is truncated")
+    keys = [(step, KEYS[code]) for step, code in InputTrace.KEY.iter_unpack(data[InputTrace.HEADER.size:])]
+    return InputTrace(seed, rewind_ticks, level, digest, keys, steps)
+
+  def save(self, fname: str) -> None:
+    with open(fname, "wb") as f:
+      f.write(self.to_bytes())
+
+  @staticmethod
+  def load(fname: str) -> "InputTrace":
+    with open(fname, "rb") as f:
+      return InputTrace.from_bytes(f.read())
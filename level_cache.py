@@ -0,0 +1,220 @@
+import hashlib
+import io
+import mmap
+import os
+import struct
+import threading
+from collections import OrderedDict
+from game_items import GameObject, build_game_objects, is_static_tile, GAME_OBJECT_FACTORIES
+from static_layer import StaticLayer
+
+# parsing a level means looking at every character in the text file, so the
+# result is saved next to it (level9.txt -> level9.lvl) and reused as long as
+# the text hasn't changed.
+#
+# a compiled level is laid out so it can be mmap'd:
+#   header   magic, format version, sha1 of the text and the registered tile
+#            types, the size of the tile array, the world size and the number
+#            of actors
+#   tiles    height * width bytes, the StaticLayer's cells
+#   actors   one (character, y, x) entry per non-static object, in file order
+class CompiledLevel(object):
+  MAGIC = b"SSLV"
+  VERSION = 1
+  HEADER = struct.Struct("<4sH20sIIIII")
+  ACTOR = struct.Struct("<Iii")
+
+  def __init__(self, digest: bytes, height: int, width: int, world_size: tuple[int, int],
+               tiles: bytes, actors: list[tuple[str, tuple[int, int]]]):
+    self.digest = digest
+    self.height = height
+    self.width = width
+    self.world_size = world_size
+    self.tiles = tiles
+    self.actors = actors
+
+  def static_layer(self) -> StaticLayer:
+    static = StaticLayer(self.height, self.width, self.tiles)
+    static.world_size = self.world_size
+    return static
+
+  def instantiate_actors(self) -> list[GameObject]:
+    return build_actors(self.actors)
+
+  def to_bytes(self) -> bytes:
+    header = CompiledLevel.HEADER.pack(CompiledLevel.MAGIC, CompiledLevel.VERSION, self.digest,
+                                       self.height, self.width, self.world_size[0], self.world_size[1],
+                                       len(self.actors))
+    actor_table = b"".join(CompiledLevel.ACTOR.pack(ord(ch), pos[0], pos[1]) for ch, pos in self.actors)
+    return header + self.tiles + actor_table
+
+  @staticmethod
+  def from_buffer(buf) -> "CompiledLevel|None":
+    # returns None if buf isn't a compiled level we understand.
+    if len(buf) < CompiledLevel.HEADER.size:
+      return None
+    magic, version, digest, height, width, world_height, world_width, actor_count = CompiledLevel.HEADER.unpack_from(buf, 0)
+    if magic != CompiledLevel.MAGIC or version != CompiledLevel.VERSION:
+      return None
+    tiles_start = CompiledLevel.HEADER.size
+    actors_start = tiles_start + height * width
+    if len(buf) != actors_start + actor_count * CompiledLevel.ACTOR.size:
+      return None
+    tiles = bytes(buf[tiles_start:actors_start])
+    actors = [(chr(code), (y, x)) for code, y, x in CompiledLevel.ACTOR.iter_unpack(buf[actors_start:])]
+    return CompiledLevel(digest, height, width, (world_height, world_width), tiles, actors)
+
+def build_actors(actor_table: list[tuple[str, tuple[int, int]]]) -> list[GameObject]:
+  # makes all the objects of each type together, then puts them back in file
+  # order since that's the order they tick and collide in.
+  positions_by_char: dict[str, list[tuple[int, int]]] = {}
+  for ch, pos in actor_table:
+    positions_by_char.setdefault(ch, []).append(pos)
+  built = {}
+  for ch, positions in positions_by_char.items():
+    built[ch] = iter(build_game_objects(ch, positions))
+  actors = []
+  for ch, _ in actor_table:
+    item = next(built[ch])
+    if item is not None:
+      actors.append(item)
+  return actors
+
+def level_digest(data: bytes) -> bytes:
+  h = hashlib.sha1(data)
+  hash_tile_types(h)
+  return h.digest()
+
+def hash_tile_types(h) -> None:
+  # which tiles are registered changes how the text compiles, so that's part
+  # of the hash too.
+  for ch in sorted(GAME_OBJECT_FACTORIES):
+    h.update(f"|{ch}{'s' if is_static_tile(ch) else 'a'}".encode("utf-8"))
+
+def cache_path(fname: str) -> str:
+  return os.path.splitext(fname)[0] + ".lvl"
+
+def parse_level(text: str, digest: bytes) -> tuple[CompiledLevel, list[GameObject], StaticLayer]:
+  # reads the level the slow way, one character at a time. returns the objects
+  # it made along the way too so the first load doesn't have to make them twice.
+  input = io.StringIO(text, newline=None).readlines()
+
+  static = StaticLayer(len(input), max([len(row) for row in input], default=0))
+  actor_table = []
+  max_y = -1
+  max_x = -1
+  for y in range(len(input)):
+    row = input[y]
+    # 0,0 in the input is y_max,0 in the game. y_max = len(input) - 1
+    game_y = len(input) - y - 1
+    for x in range(len(row)):
+      ch = row[x]
+      if ch not in GAME_OBJECT_FACTORIES:
+        continue
+      game_pos = (game_y, x)
+      if is_static_tile(ch):
+        static.add(game_pos)
+        max_y = max(max_y, game_y)
+        max_x = max(max_x, x)
+      else:
+        actor_table.append((ch, game_pos))
+
+  stuff = build_actors(actor_table)
+  for item in stuff:
+    for pos in item.positions():
+      max_y = max(max_y, pos[0])
+      max_x = max(max_x, pos[1])
+
+  static.world_size = (max_y + 1, max_x + 1)
+  compiled = CompiledLevel(digest, static.height, static.width, static.world_size, static.to_bytes(), actor_table)
+  return compiled, stuff, static
+
+def read_cache(fname: str, digest: bytes) -> CompiledLevel|None:
+  try:
+    with open(cache_path(fname), "rb") as f:
+      if os.fstat(f.fileno()).st_size == 0:
+        return None
+      with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        compiled = CompiledLevel.from_buffer(buf)
+  except (OSError, ValueError, struct.error):
+    return None
+  if compiled is None or compiled.digest != digest:
+    return None
+  return compiled
+
+def write_cache(fname: str, compiled: CompiledLevel) -> None:
+  path = cache_path(fname)
+  tmp_path = f"{path}.{os.getpid()}.tmp"
+  try:
+    with open(tmp_path, "wb") as f:
+      f.write(compiled.to_bytes())
+    os.replace(tmp_path, path)
+  except OSError:
+    # the cache is only an optimization, e.g. the levels might be read-only.
+    try:
+      os.remove(tmp_path)
+    except OSError:
+      pass
+
+def compile_level(fname: str) -> tuple[CompiledLevel, list[GameObject]|None, StaticLayer|None]:
+  # returns the compiled level, plus the objects and static layer if we had to
+  # parse the text to get it.
+  with open(fname, "rb") as f:
+    data = f.read()
+  digest = level_digest(data)
+  compiled = read_cache(fname, digest)
+  if compiled is not None:
+    return compiled, None, None
+  compiled, actors, static = parse_level(data.decode("utf-8"), digest)
+  write_cache(fname, compiled)
+  return compiled, actors, static
+
+def load_level(fname: str) -> tuple[list[GameObject], StaticLayer]:
+  compiled, actors, static = compile_level(fname)
+  if actors is None or static is None:
+    return compiled.instantiate_actors(), compiled.static_layer()
+  return actors, static
+
+class LevelTemplateCache(object):
+  # keeps the most recently used compiled levels in memory so starting,
+  # restarting or switching levels doesn't touch the disk. a compiled level is
+  # a template: instantiate_actors() and static_layer() make a fresh copy.
+  def __init__(self, max_size: int = 8):
+    self.max_size = max_size
+    self.__templates: OrderedDict[str, CompiledLevel] = OrderedDict()
+    self.__lock = threading.Lock()
+
+  def __len__(self) -> int:
+    with self.__lock:
+      return len(self.__templates)
+
+  def __contains__(self, fname: str) -> bool:
+    with self.__lock:
+      return fname in self.__templates
+
+  def get(self, fname: str) -> CompiledLevel:
+    with self.__lock:
+      template = self.__templates.get(fname)
+      if template is not None:
+        self.__templates.move_to_end(fname)
+        return template
+    # compile outside the lock so a slow level doesn't block the others.
+    template = compile_level(fname)[0]
+    with self.__lock:
+      self.__templates[fname] = template
+      self.__templates.move_to_end(fname)
+      while len(self.__templates) > self.max_size:
+        self.__templates.popitem(last=False)
+    return template
+
+  def preload(self, fnames: list[str]) -> threading.Thread:
+    # loads up to max_size levels on a background thread.
+    def task():
+      for fname in fnames[:self.max_size]:
+        try:
+          self.get(fname)
+        except (OSError, ValueError):
+          pass
+    thread = threading.Thread(target=task, daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,129 @@
+#!/Users/nsanch/kids-project/.venv/bin/python
+
+# makes side-scroller levels of any size from a seed, in the same text format
+# as side-scroller-levels/*.txt.
+#
+#   ./level_generator.py --size 40x250000 --seed 7 --output big.txt
+#
+# the level is walled in with bricks. platforms sit on every PLATFORM_SPACING
+# rows above the ground, far enough apart that anything standing on one fits
+# under the next. actors are scattered with roughly density of them per empty
+# cell that has a brick under it, and a FLYING_SHARE of that in the air above
+# the lowest platform. the player starts at the bottom left and the flag is at
+# the bottom right, with nothing else nearby.
+#
+# rows are made top to bottom and written as they're made, so a level with
+# millions of cells never has to fit in memory. the same size, seed and
+# densities always make the same level.
+
+import argparse
+import random
+import sys
+from typing import Iterator
+
+PLATFORM_SPACING = 6
+# the lowest platform is above the flag, which is 7 tall.
+FIRST_PLATFORM = 8
+# columns at each end kept clear for the player and the flag.
+START_AREA = 16
+END_AREA = 6
+FLYING_SHARE = 0.1
+
+# (tile, weight). these only go in a cell with a brick right under it.
+STANDING_ACTORS = [("b", 30), ("B", 5), ("T", 10), ("🔥", 10), ("E", 5), ("H", 3), ("/", 4), ("\\", 4)]
+FLYING_ACTORS = [("W", 10), ("L", 1)]
+
+def weighted_picker(rng: random.Random, weights: list[tuple[str, int]]):
+  tiles = [tile for tile, _ in weights]
+  cum_weights = []
+  total = 0
+  for _, weight in weights:
+    total += weight
+    cum_weights.append(total)
+  return lambda: rng.choices(tiles, cum_weights=cum_weights)[0]
+
+def skip(rng: random.Random, density: float) -> int:
+  # how far to the next hit if each cell is one with probability density.
+  # picking the gaps instead of rolling for every cell keeps big levels fast.
+  if density >= 1:
+    return 1
+  return 1 + int(rng.expovariate(density))
+
+def generate_rows(height: int, width: int, seed: int = 0, density: float = 0.01,
+                  platform_density: float = 0.3, breakable: float = 0.1) -> Iterator[str]:
+  # yields the rows of the level from the top down, without newlines.
+  if height < FIRST_PLATFORM + 2 or width < START_AREA + END_AREA:
+    raise ValueError(f"a level has to be at least {FIRST_PLATFORM + 2}x{START_AREA + END_AREA}")
+  rng = random.Random(seed)
+  standing = weighted_picker(rng, STANDING_ACTORS)
+  flying = weighted_picker(rng, FLYING_ACTORS)
+
+  def platform_gap() -> int:
+    if platform_density >= 1:
+      return 0
+    return int(rng.expovariate(platform_density / (7.5 * (1 - platform_density))))
+
+  def bricks(row: int) -> list[str]:
+    game_y = height - row - 1
+    if game_y == 0 or row == 0:
+      return ["="] * width
+    cells = [" "] * width
+    cells[0] = cells[-1] = "="
+    if game_y >= FIRST_PLATFORM and (game_y - FIRST_PLATFORM) % PLATFORM_SPACING == 0 and platform_density > 0:
+      # platforms are 3 to 12 long, 7.5 on average, with gaps that make them
+      # cover about platform_density of the row.
+      x = START_AREA + platform_gap()
+      while x < width - END_AREA:
+        length = rng.randint(3, 12)
+        for i in range(x, min(x + length, width - END_AREA)):
+          cells[i] = "+" if rng.random() < breakable else "="
+        x += length + 1 + platform_gap()
+    return cells
+
+  below = bricks(0)
+  for row in range(height):
+    cells = below
+    if row + 1 < height:
+      below = bricks(row + 1)
+    if 0 < row < height - 1 and density > 0:
+      x = START_AREA - 1 + skip(rng, density)
+      in_the_air = height - row - 1 >= FIRST_PLATFORM
+      while x < width - END_AREA:
+        if cells[x] == " ":
+          if below[x] != " ":
+            cells[x] = standing()
+          elif in_the_air and rng.random() < FLYING_SHARE:
+            cells[x] = flying()
+        x += skip(rng, density)
+    if row == height - 2:
+      cells[2] = "P"
+      cells[width - 3] = "F"
+    yield "".join(cells)
+
+def write_level(fname: str, height: int, width: int, seed: int = 0, density: float = 0.01,
+                platform_density: float = 0.3, breakable: float = 0.1) -> None:
+  with open(fname, "w", encoding="utf-8") as f:
+    for row in generate_rows(height, width, seed, density, platform_density, breakable):
+      f.write(row)
+      f.write("\n")
+
+def main(argv: list[str]) -> int:
+  parser = argparse.ArgumentParser(description="Make a side-scroller level.")
+  parser.add_argument("--size", default="40x400", help="level size as ROWSxCOLUMNS")
+  parser.add_argument("--seed", type=int, default=0, help="the same seed makes the same level")
+  parser.add_argument("--density", type=float, default=0.01, help="actors per empty cell")
+  parser.add_argument("--platforms", type=float, default=0.3, help="how much of each platform row is bricks")
+  parser.add_argument("--breakable", type=float, default=0.1, help="how many platform bricks are breakable")
+  parser.add_argument("--output", required=True, help="where to write the level")
+  args = parser.parse_args(argv)
+
+  height, width = (int(n) for n in args.size.split("x"))
+  try:
+    write_level(args.output, height, width, args.seed, args.density, args.platforms, args.breakable)
+  except ValueError as e:
+    print(e, file=sys.stderr)
+    return 1
+  return 0
+
+if __name__ == "__main__":
+  sys.exit(main(sys.argv[1:]))
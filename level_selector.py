@@ -2,6 +2,7 @@ import curses
 import json
 import os
 from buffered_window import BufferedCenterableWindow
+from level_cache import CompiledLevel, LevelTemplateCache
 
 class Level(object):
   def __init__(self, id, description, path):
@@ -10,11 +11,14 @@ class Level(object):
     self.path = path
 
 class LevelSelector(object):
-  def __init__(self, stdscr, rootdir):
+  def __init__(self, stdscr, rootdir, max_cached_levels=8):
     self.__stdscr = stdscr
     self.__rootdir = rootdir
     self.__win = BufferedCenterableWindow(stdscr.subwin(curses.LINES, curses.COLS, 0, 0))
     self.__levels = self.read_levels()
+    # the levels load in the background while the menu is up.
+    self.__templates = LevelTemplateCache(max_cached_levels)
+    self.__templates.preload([level.path for level in self.__levels])
 
   def read_levels(self):
     with open(os.path.join(self.__rootdir, "levels.json")) as f:
@@ -22,10 +26,23 @@ class LevelSelector(object):
 
     levels = []
     for level in levels_json:
-      path = os.path.join(self.__rootdir, "side-scroller-levels", level["path"])
+      path = os.path.join(self.__rootdir, level["path"])
       levels.append(Level(level["id"], level["description"], path))
     return levels
   
+  def level_path(self, level_id: int) -> str:
+    for level in self.__levels:
+      if level.id == level_id:
+        return level.path
+    return os.path.join(self.__rootdir, f"level{level_id}.txt")
+
+  def level_template(self, level_id: int) -> CompiledLevel:
+    return self.__templates.get(self.level_path(level_id))
+
+  def prefetch(self, level_id: int) -> None:
+    # e.g. the next level, while this one is being played.
+    self.__templates.preload([self.level_path(level_id)])
+
   def get_input(self):
     return self.__stdscr.getstr().decode("utf-8")
 
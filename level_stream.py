@@ -0,0 +1,131 @@
+import array
+import hashlib
+import mmap
+from bisect import bisect_right
+from chunked_world import CHUNK_HEIGHT, CHUNK_WIDTH
+from game_items import GAME_OBJECT_FACTORIES, Player, is_static_tile
+from level_cache import hash_tile_types
+from static_layer import StaticLayer
+
+# reads a level file a chunk at a time instead of all at once, so a huge level
+# can start as soon as the part around the player has been read.
+#
+# opening the level only finds where each row starts, which is 8 bytes per
+# row. knowing how many rows there are is all it takes to turn a row in the
+# file into a y in the game. the player is found by searching the raw bytes,
+# without parsing anything. after that, read_chunk() parses just the cells a
+# ChunkedWorld asks for:
+#   - rows are read in bands of CHUNK_HEIGHT, the same as the world's chunks.
+#   - each row of a band remembers how far into it we've read, so a band is
+#     read left to right, CHUNK_WIDTH columns at a time.
+# the file is mmap'd, so the text that's been read doesn't stay in memory.
+# what's kept is the same as for a compiled level: one byte per cell in the
+# StaticLayer and a (character, position) entry per actor.
+class LevelStream(object):
+  def __init__(self, fname: str):
+    self.fname = fname
+    with open(fname, "rb") as f:
+      size = f.seek(0, 2)
+      # an empty file can't be mmap'd.
+      self.__map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size > 0 else b""
+    # __offsets[r] is where row r of the file starts and __offsets[r + 1] is
+    # where it ends, newline included.
+    self.__offsets = array.array("q", [0])
+    width = 0
+    start = 0
+    while start < size:
+      end = self.__map.find(b"\n", start)
+      end = size if end == -1 else end + 1
+      self.__offsets.append(end)
+      width = max(width, end - start)
+      start = end
+    self.height = len(self.__offsets) - 1
+    # a row can't have more characters than it has bytes.
+    self.static = StaticLayer(self.height, width)
+    self.static.world_size = (0, 0)
+    # how far into each row we've read.
+    self.__cursors = array.array("q", self.__offsets[:-1])
+    # for each band, how many chunks from the left have been read.
+    self.__columns_read: dict[int, int] = {}
+    self.bytes_read = 0
+    self.player_start = self.__find_player()
+
+  def size(self) -> int:
+    return self.__offsets[-1]
+
+  def fraction_read(self) -> float:
+    return self.bytes_read / self.size() if self.size() > 0 else 1.0
+
+  def digest(self) -> bytes:
+    # the same as level_cache.level_digest() of the whole file, for checking
+    # input traces. this reads all of it, but without parsing anything.
+    h = hashlib.sha1(self.__map)
+    hash_tile_types(h)
+    return h.digest()
+
+  def read_chunk(self, chunk: tuple[int, int]) -> list[tuple[str, tuple[int, int]]]:
+    # reads chunk and any chunks to the left of it in the same band that
+    # haven't been read yet. returns the actors in them, in file order.
+    band, column = chunk
+    first_y = band * CHUNK_HEIGHT
+    if band < 0 or column < 0 or first_y >= self.height:
+      return []
+    columns_read = self.__columns_read.get(band, 0)
+    if column < columns_read:
+      return []
+    self.__columns_read[band] = column + 1
+    x = columns_read * CHUNK_WIDTH
+    count = (column + 1 - columns_read) * CHUNK_WIDTH
+
+    actors = []
+    max_y, max_x = self.static.world_size[0] - 1, self.static.world_size[1] - 1
+    # top row first, the same order the file is in.
+    for game_y in range(min(self.height, first_y + CHUNK_HEIGHT) - 1, first_y - 1, -1):
+      text = self.__read_row(self.height - game_y - 1, count)
+      for i in range(len(text)):
+        ch = text[i]
+        if ch not in GAME_OBJECT_FACTORIES:
+          continue
+        game_pos = (game_y, x + i)
+        if is_static_tile(ch):
+          self.static.add(game_pos)
+        else:
+          actors.append((ch, game_pos))
+        max_y = max(max_y, game_y)
+        max_x = max(max_x, x + i)
+    # grows as more of the level is read.
+    self.static.world_size = (max_y + 1, max_x + 1)
+    return actors
+
+  def __read_row(self, row: int, count: int) -> str:
+    # the next count characters of row.
+    start = self.__cursors[row]
+    end = self.__offsets[row + 1]
+    if start >= end:
+      return ""
+    # a character is at most 4 bytes of utf-8. don't cut one in half.
+    stop = min(end, start + 4 * count)
+    while stop < end and self.__map[stop] & 0xC0 == 0x80:
+      stop -= 1
+    text = self.__map[start:stop].decode("utf-8")
+    if len(text) > count:
+      text = text[:count]
+      stop = start + len(text.encode("utf-8"))
+    self.__cursors[row] = stop
+    self.bytes_read += stop - start
+    return text
+
+  def __find_player(self) -> tuple[int, int]|None:
+    # the first player in the file, the same one a full parse would find.
+    found = -1
+    for ch, factory in GAME_OBJECT_FACTORIES.items():
+      if factory is not Player:
+        continue
+      offset = self.__map.find(ch.encode("utf-8"))
+      if offset != -1 and (found == -1 or offset < found):
+        found = offset
+    if found == -1:
+      return None
+    row = bisect_right(self.__offsets, found) - 1
+    x = len(self.__map[self.__offsets[row]:found].decode("utf-8"))
+    return self.height - row - 1, x
@@ -7,6 +7,8 @@ import random
 import sys
 import os
 import json
+from frame_commit import FrameCommitter
+from game_loop import GameLoop
 
 class Collidable(object):
   def __init__(self):
@@ -218,7 +220,8 @@ class Game(object):
     return Game.CONTINUING
   
   def render(self, stdscr):
-    stdscr.clear()
+    # erase() rather than clear(), which would repaint the whole terminal.
+    stdscr.erase()
     for item in self.items:
       item.render(stdscr)
     stdscr.addstr(0, 0, f"CPU: {self.score[0]}")
@@ -227,14 +230,14 @@ class Game(object):
       stdscr.addstr(curses.LINES // 2, (curses.COLS - len(self.status_msg)) // 2, self.status_msg)      
     stdscr.addstr(2, 0, "Type 'e' to exit. 'r' to restart. 'p' to pause. Up to move paddle up, down to move down.")
     stdscr.addstr(4, 0, self.debug_msg())
-    stdscr.refresh()
 
-  def refresh_window(self, stdscr):
+  def step(self) -> bool:
+    # advances the game one tick. returns False once the game is over.
     try:
       self.acquire_lock()
 
       if self.game_over():
-        return
+        return False
       
       if self.game_state == Game.RUNNING:
         tick_result = self.tick()
@@ -252,17 +255,26 @@ class Game(object):
           else:
             self.status_msg = f"Point to the computer! The score is {self.score[0]}-{self.score[1]}. Hit 'p' to continue."
             self.game_state = Game.WAITING_FOR_NEXT_POINT
-        
-      self.render(stdscr)
 
-      def task():
-        self.refresh_window(stdscr)
+      return not self.game_over()
+    finally:
+      self.release_lock()
 
-      if not self.game_over():
-        threading.Timer(self.speed(), task).start()
+  def draw(self, stdscr, frame: FrameCommitter):
+    try:
+      self.acquire_lock()
+      if self.game_state != Game.QUIT:
+        self.render(stdscr)
+        frame.stage(stdscr)
+        frame.commit()
     finally:
       self.release_lock()
 
+  def start_loop(self, stdscr, frame: FrameCommitter) -> GameLoop:
+    loop = GameLoop(self.step, lambda: self.draw(stdscr, frame), self.speed)
+    loop.start()
+    return loop
+
   def speed(self):
     total_score = self.score[0] + self.score[1]
     base_speed = 0.1
@@ -302,20 +314,32 @@ class Game(object):
     finally:
       self.release_lock()
 
-def play_game(stdscr, level):
+def play_game(stdscr, level) -> int|None:
+  # returns the next level to play, or None to exit.
   stdscr.clear()
 
   game = Game(level)
-  game.refresh_window(stdscr)
+  frame = FrameCommitter()
+  loop = game.start_loop(frame.count(stdscr), frame)
 
+  next_level = None
   while game.game_state != Game.QUIT:
     k = stdscr.getkey()
     if game.game_over():
       if k == 'r':
-        play_game(stdscr, level=level+1)
+        next_level = level + 1
+        break
       elif k == 'e':
         break
     else:
       game.accept_keypress(k, stdscr)
+  loop.stop()
+  loop.join()
+  return next_level
+
+def play_session(stdscr, level):
+  next_level = level
+  while next_level is not None:
+    next_level = play_game(stdscr, next_level)
  
-curses.wrapper(play_game, int(sys.argv[1]) if len(sys.argv) > 1 else 1)
\ No newline at end of file
+curses.wrapper(play_session, int(sys.argv[1]) if len(sys.argv) > 1 else 1)
\ No newline at end of file
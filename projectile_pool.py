@@ -0,0 +1,68 @@
+# fireballs and cannonballs come and go every few ticks, so instead of making
+# a new object each time the game hands back one that was removed earlier.
+# acquire() runs __init__ again on a reused object, which resets every slot.
+class ProjectilePool(object):
+  def __init__(self, max_free: int = 256):
+    # how many removed objects of each type to hold on to.
+    self.max_free = max_free
+    self.__free: dict[type, list] = {}
+    self.__in_flight: dict[type, int] = {}
+    self.__peak_in_flight: dict[type, int] = {}
+    self.acquired = 0
+    self.reused = 0
+
+  def acquire(self, cls: type, *args, **kwargs):
+    free = self.__free.get(cls)
+    if free:
+      item = free.pop()
+      item.__init__(*args, **kwargs)
+      self.reused += 1
+    else:
+      item = cls(*args, **kwargs)
+    self.acquired += 1
+    in_flight = self.__in_flight.get(cls, 0) + 1
+    self.__in_flight[cls] = in_flight
+    if in_flight > self.__peak_in_flight.get(cls, 0):
+      self.__peak_in_flight[cls] = in_flight
+    return item
+
+  def release(self, item) -> None:
+    # item must not be used again by whoever released it.
+    cls = type(item)
+    if cls not in self.__in_flight:
+      return
+    self.__in_flight[cls] -= 1
+    free = self.__free.setdefault(cls, [])
+    if len(free) < self.max_free:
+      free.append(item)
+
+  def clear(self) -> None:
+    # forgets the free objects, e.g. when a game is restored from a snapshot
+    # that might bring some of them back. what's in flight is worked out again
+    # by the caller with reset_in_flight().
+    self.__free.clear()
+
+  def reset_in_flight(self, items) -> None:
+    self.__in_flight = {cls: 0 for cls in self.__in_flight}
+    for item in items:
+      cls = type(item)
+      if cls in self.__in_flight:
+        self.__in_flight[cls] += 1
+
+  def free_count(self) -> int:
+    return sum(len(free) for free in self.__free.values())
+
+  def hit_rate(self) -> float:
+    if self.acquired == 0:
+      return 0.0
+    return self.reused / self.acquired
+
+  def stats(self) -> dict:
+    return {
+      "acquired": self.acquired,
+      "reused": self.reused,
+      "hit_rate": self.hit_rate(),
+      "free": self.free_count(),
+      "in_flight": {cls.__name__: n for cls, n in self.__in_flight.items()},
+      "peak_in_flight": {cls.__name__: n for cls, n in self.__peak_in_flight.items()},
+    }
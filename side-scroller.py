@@ -1,241 +1,34 @@
 #!/Users/nsanch/kids-project/.venv/bin/python
 
+import argparse
 import curses
-import math
-import threading
-import time
-import random
-import sys
 import os
-import json
+import time
+from input_trace import InputTrace
 from level_selector import LevelSelector
-from buffered_window import BufferedCenterableWindow
-from game_items import *
-
-class DebugLogger(object):
-  def __init__(self):
-    self.log: list[str] = []
-
-  def add(self, msg: str) -> None:
-    self.log.append(msg)
-    if len(self.log) > 3:
-      self.log = self.log[-3:]
-
-  def get_log_str(self) -> str:
-    return '|'.join(self.log)
-
-debugger: DebugLogger = DebugLogger()
-
-class GameWindow(object):
-  def __init__(self, stdscr):
-    self.__stdscr = stdscr
-    self.__status_area = stdscr.subwin(5, curses.COLS, 0, 0)
-    self.__game_area = BufferedCenterableWindow(stdscr.subwin(curses.LINES - 5, curses.COLS, 5, 0))
-
-  def status_area(self):
-    return self.__status_area
-  
-  def game_area(self):
-    return self.__game_area
-  
-  def clear(self):
-    self.game_area().clear()
-    self.status_area().clear()
-    self.__stdscr.clear()
-
-  def refresh(self, player_location):
-    self.game_area().refresh(player_location)
-    self.status_area().refresh()
-    self.__stdscr.refresh()
-
-  def repaint(self):
-    self.game_area().repaint()
-
-class Game(object):
-  # game states
-  RUNNING = 0
-  PAUSED = 1
-  LOST = 2
-  QUIT = 3
-  WON = 4
-  WAITING_FOR_NEXT_LEVEL = 5
-
-  # results of tick()
-  TICK_CONTINUING = 0
-  TICK_LOSS = 1
-  TICK_WIN = 2
-  TICK_CPU_POINT = 3
-  TICK_PLAYER_POINT = 4
-
-  def __init__(self, initial_state, level):
-    self.items = initial_state
-    self.game_state = Game.RUNNING
-    for i in self.items:
-      if isinstance(i, Player):
-        self.player = i
-      elif isinstance(i, EndingFlag):
-        self.ending_flag = i
-    self.lock = threading.Lock()
-    self.score = (0, 0)
-    self.status_msg = None
-    self.speed_boost = 0
-    self.level = level
-
-  def acquire_lock(self):
-    self.lock.acquire()
-  
-  def release_lock(self):
-    self.lock.release()
-
-  def game_over(self):
-    return self.game_state in [Game.LOST, Game.QUIT, Game.WON]
-  
-  def items_at(self, positions_to_check):
-    ret = []
-    for item in self.items:
-      for position in positions_to_check:
-        if position in item.positions():
-          ret.append(item)
-          break
-    return ret
-  
-  def add_item(self, item):
-    self.items.append(item)
-  
-  def debug_msg(self):
-    #return ""
-    x = []
-    item = self.player
-    if isinstance(item, MovableObject):
-      x.append(f"Pos: {item.position}, Vel: {item.velocity}")
-    return "|".join(x) + debugger.get_log_str()
-
-  def tick(self):
-    if self.game_over():
-      # this shouldn't really get called if the game's over.
-      return None
-    
-    for item in self.items:
-      item.tick(self)
-    self.items = [i for i in self.items if not i.should_be_removed_from_game() or i == self.player]
-
-    
-    if self.ending_flag.had_collision:
-      return Game.TICK_WIN
-    
-    if self.player.should_be_removed_from_game():
-      return Game.TICK_LOSS
+from side_scroller_game import Game, GameWindow, LEVELS_DIR, new_game
 
-    return Game.TICK_CONTINUING
-  
-  def render(self, game_window: GameWindow):
-    game_window.clear()
-    for item in self.items:
-      item.render(game_window.game_area())
-    if self.status_msg is not None:
-      height, width = game_window.status_area().getmaxyx()
-      avail_width = width - ((width - len(self.status_msg)) // 2)
-      game_window.status_area().addstr(2, (width - len(self.status_msg)) // 2, self.status_msg[:avail_width-1])
-    game_window.status_area().addstr(1, 0, "Type 'e' to exit. 'r' to restart. 'p' to pause. Up/left/right/down to move.")
-    game_window.status_area().addstr(3, 0, self.debug_msg())
-    game_window.status_area().hline(4, 0, '-', curses.COLS)
-    game_window.refresh(self.player.positions())
+# about ten seconds at the normal speed.
+REWIND_TICKS = 100
 
-  def refresh_window(self, game_window: GameWindow):
-    try:
-      self.acquire_lock()
-      
-      if self.game_state == Game.RUNNING:
-        tick_result = self.tick()
-
-        if tick_result == Game.TICK_WIN:
-          self.status_msg = "You've completed the level! 's' to pick a level, 'p' for next, 'e' to exit, 'r' to restart."
-          self.game_state = Game.WON
-        elif tick_result == Game.TICK_LOSS:
-          self.status_msg = "Oh no! You died. :( :( Hit 'r' to restart or 'e' to exit."
-          self.game_state = Game.LOST
-    
-      player_location = self.player.positions()
-      game_window.game_area().center_around(player_location)
-      self.render(game_window)
-
-      def task():
-        self.refresh_window(game_window)
-
-      if not self.game_over():
-        threading.Timer(self.speed(), task).start()
-    finally:
-      self.release_lock()
-
-  def speed(self):
-    total_score = self.score[0] + self.score[1]
-    base_speed = 0.1
-    adjustment_by_score = 0.005*total_score
-    boost_multiplier = 1
-    boost_denominator = 1
-    if self.speed_boost < 0:
-      boost_multiplier = -1 * self.speed_boost
-    else:
-      boost_denominator = 1 + self.speed_boost
-    max_speed = 0.02
-    min_speed = 0.5
-
-    return min(min_speed, max(max_speed, ((base_speed - adjustment_by_score) * boost_multiplier) / boost_denominator))
-  
-  def accept_keypress(self, k, stdscr: curses.window):
-    try:
-      self.acquire_lock()
-      if k == "p":
-        if self.game_state in [Game.PAUSED, Game.WAITING_FOR_NEXT_LEVEL]:
-          self.game_state = Game.RUNNING
-          self.status_msg = None
-        else:
-          self.game_state = Game.PAUSED
-          self.status_msg = "Game paused. Press 'p' to continue."
-      elif k == " " or k == "KEY_UP":
-        self.player.jump()
-      elif k == "f":
-        self.player.fire(self)
-      elif k == "KEY_RIGHT":
-        self.player.right()
-      elif k == "KEY_LEFT":
-        self.player.left()
-      elif k == "KEY_DOWN":
-        self.player.down()
-      elif k == "e":
-        self.game_state = Game.QUIT
-      elif k == "f":
-        self.speed_boost = min(5, 1 + self.speed_boost)
-      elif k == "s":
-        self.speed_boost = max(-5, self.speed_boost - 1)
-    finally:
-      self.release_lock()
-
-def load_initial_state(fname):
-  with open(fname, "r") as f:
-    input = f.readlines()
-
-  stuff = []
-  for y in range(len(input)):
-    row = input[y]
-    # 0,0 in the input is y_max,0 in the game. y_max = len(input) - 1
-    game_y = len(input) - y - 1
-    for x in range(len(row)):
-      ch = row[x]
-      game_pos = (game_y, x)
-      item = get_game_object_for_name(ch, game_pos)
-      if item is not None:
-        stuff.append(item)
-
-  return stuff
-
-def play_game(stdscr: curses.window, level: int):
+def play_game(stdscr: curses.window, level: int, level_selector: LevelSelector, record_dir: str|None=None) -> int|None:
+  # plays one level until the player picks what to do next. returns the next
+  # level to play, or None to exit. with record_dir, the game's keys are saved
+  # there so ./headless.py --replay can play it back.
   stdscr.clear()
 
-  game = Game(load_initial_state(f"/Users/nsanch/kids-project/side-scroller-levels/level{level}.txt"), level)
+  # every game gets its own copy of the cached level, and restarts put that
+  # copy back to its first snapshot instead of loading it again.
+  template = level_selector.level_template(level)
+  game = new_game(template, level, rewind_ticks=REWIND_TICKS)
+  if record_dir is not None:
+    game.recording = InputTrace(game.seed, game.rewind_ticks, level, template.digest)
+  level_selector.prefetch(level + 1)
   game_window = GameWindow(stdscr)
-  game.refresh_window(game_window)
+  loop = game.start_loop(game_window)
 
+  next_level = None
+  choose_level = False
   while game.game_state != Game.QUIT:
     k = None
     try:
@@ -245,28 +38,50 @@ def play_game(stdscr: curses.window, level: int):
     if k == "KEY_RESIZE":
       game_window.repaint()
     elif game.game_over():
-      if k == 'p':
-        if game.game_state == Game.WON:
-          play_game(stdscr, level=level + 1)
-        else:
-          play_game(stdscr, level=level)
+      if k == 'p' and game.game_state == Game.WON:
+        next_level = level + 1
         break
       elif k == 's':
-        select_level(stdscr)
-        break
-      elif k == 'r':
-        play_game(stdscr, level=level)
+        choose_level = True
         break
+      elif k in ('p', 'r', 'z'):
+        # the loop stops once the game's over, so put the game back how it
+        # was and start a new one.
+        loop.stop()
+        loop.join()
+        if k == 'z':
+          game.accept_keypress(k, stdscr)
+        else:
+          game.restart()
+        loop = game.start_loop(game_window)
       elif k == 'e':
         break
       else:
         pass
     else:
       game.accept_keypress(k, stdscr)
-
-def select_level(stdscr):
-  level_selector = LevelSelector(stdscr, "/Users/nsanch/kids-project/side-scroller-levels")
-  selected_level = level_selector.render_and_get_selected_level()
-  play_game(stdscr, selected_level)
- 
-curses.wrapper(select_level)
\ No newline at end of file
+  loop.stop()
+  loop.join()
+
+  if game.recording is not None:
+    game.recording.steps = game.step_count
+    game.recording.save(os.path.join(record_dir, f"level{level}-{int(time.time() * 1000)}.trace"))
+
+  if choose_level:
+    return level_selector.render_and_get_selected_level()
+  return next_level
+
+def play_session(stdscr, record_dir=None):
+  # one game after another, without recursing, so each finished game can be
+  # freed before the next one starts.
+  level_selector = LevelSelector(stdscr, LEVELS_DIR)
+  level = level_selector.render_and_get_selected_level()
+  while level is not None:
+    level = play_game(stdscr, level, level_selector, record_dir)
+
+parser = argparse.ArgumentParser(description="Play the side-scroller.")
+parser.add_argument("--record", metavar="DIR", help="save a trace of each game played to DIR")
+args = parser.parse_args()
+if args.record:
+  os.makedirs(args.record, exist_ok=True)
+curses.wrapper(play_session, args.record)
\ No newline at end of file
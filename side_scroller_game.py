@@ -0,0 +1,451 @@
+import curses
+import threading
+import os
+import random
+from collections import deque
+from buffered_window import BufferedCenterableWindow
+from frame_commit import FrameCommitter
+from game_loop import GameLoop
+from spatial_index import SpatialIndex
+from static_layer import StaticLayer
+from level_cache import CompiledLevel, load_level
+from level_stream import LevelStream
+from chunked_world import ChunkedWorld
+from input_trace import InputTrace, RESTART
+from projectile_pool import ProjectilePool
+from game_items import *
+
+LEVELS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "side-scroller-levels")
+
+def level_path(level: int) -> str:
+  return os.path.join(LEVELS_DIR, f"level{level}.txt")
+
+class DebugLogger(object):
+  def __init__(self):
+    self.log: list[str] = []
+    self.log_str = ""
+
+  def add(self, msg: str) -> None:
+    self.log.append(msg)
+    if len(self.log) > 3:
+      self.log = self.log[-3:]
+    self.log_str = '|'.join(self.log)
+
+  def get_log_str(self) -> str:
+    return self.log_str
+
+debugger: DebugLogger = DebugLogger()
+
+class GameWindow(object):
+  STATUS_HEIGHT = 5
+
+  def __init__(self, stdscr, frame: FrameCommitter|None=None):
+    # everything goes out to the terminal in one flush per frame.
+    self.frame = frame if frame is not None else FrameCommitter()
+    stdscr = self.frame.count(stdscr)
+    self.__stdscr = stdscr
+    lines, cols = stdscr.getmaxyx()
+    self.__status_area = stdscr.subwin(GameWindow.STATUS_HEIGHT, cols, 0, 0)
+    self.__game_area = BufferedCenterableWindow(stdscr.subwin(lines - GameWindow.STATUS_HEIGHT, cols, GameWindow.STATUS_HEIGHT, 0), double_buffered=True)
+    # row -> (x, text) for the status lines this frame and the ones on screen,
+    # so only the lines that changed get rewritten.
+    self.__status_lines: dict[int, tuple[int, str]] = {}
+    self.__shown_status_lines: dict[int, tuple[int, str]] = {}
+    # stdscr needs one refresh after it's been cleared, and the separator under
+    # the status lines only needs drawing once.
+    self.__needs_full_refresh = True
+
+  def status_area(self):
+    return self.__status_area
+  
+  def game_area(self):
+    return self.__game_area
+  
+  def clear(self):
+    # the game area keeps its last frame and only redraws what changed. the
+    # status lines stay until set_status_line() changes them.
+    self.game_area().clear()
+
+  def set_status_line(self, row: int, text: str|None, x: int = 0) -> None:
+    if text is None or text == "":
+      self.__status_lines.pop(row, None)
+    else:
+      self.__status_lines[row] = (x, text)
+
+  def refresh(self, player_location, viewport=None):
+    if self.__needs_full_refresh:
+      self.frame.stage(self.__stdscr)
+    if self.__draw_status_lines():
+      self.frame.stage(self.status_area())
+    self.game_area().draw(player_location, viewport)
+    self.frame.stage(self.game_area())
+    self.frame.commit()
+
+  def __draw_status_lines(self) -> bool:
+    # returns whether anything was drawn.
+    area = self.status_area()
+    width = area.getmaxyx()[1]
+    changed = False
+    if self.__needs_full_refresh:
+      area.erase()
+      self.__shown_status_lines = {}
+      area.hline(GameWindow.STATUS_HEIGHT - 1, 0, '-', width)
+      self.__needs_full_refresh = False
+      changed = True
+    for row in self.__shown_status_lines.keys() | self.__status_lines.keys():
+      line = self.__status_lines.get(row)
+      if line == self.__shown_status_lines.get(row):
+        continue
+      area.move(row, 0)
+      area.clrtoeol()
+      if line is not None:
+        x, text = line
+        # cut it off rather than let it wrap onto the next line.
+        area.addstr(row, x, text[:width - x])
+      changed = True
+    self.__shown_status_lines = dict(self.__status_lines)
+    return changed
+
+  def repaint(self):
+    self.__needs_full_refresh = True
+    self.game_area().repaint()
+
+class GameSnapshot(object):
+  # everything needed to put a Game back the way it was: which items were in
+  # play, in order, each one's snapshot_state(), where the rng was and which
+  # chunks of the world were parked. the static layer never changes so it
+  # isn't included.
+  __slots__ = ("items", "states", "rng_state", "world", "game_state", "status_msg", "score", "speed_boost")
+
+  def __init__(self, items, states, rng_state, world, game_state, status_msg, score, speed_boost):
+    self.items = items
+    self.states = states
+    self.rng_state = rng_state
+    self.world = world
+    self.game_state = game_state
+    self.status_msg = status_msg
+    self.score = score
+    self.speed_boost = speed_boost
+
+class Game(object):
+  # game states
+  RUNNING = 0
+  PAUSED = 1
+  LOST = 2
+  QUIT = 3
+  WON = 4
+  WAITING_FOR_NEXT_LEVEL = 5
+
+  # results of tick()
+  TICK_CONTINUING = 0
+  TICK_LOSS = 1
+  TICK_WIN = 2
+  TICK_CPU_POINT = 3
+  TICK_PLAYER_POINT = 4
+
+  # how far back each press of 'z' goes.
+  REWIND_STEP = 10
+
+  def __init__(self, initial_state, level, static=None, rewind_ticks=0, seed=None, world=None):
+    self.items = initial_state
+    # with a ChunkedWorld, initial_state is just the actors near the player.
+    self.world: ChunkedWorld|None = world
+    self.static = static if static is not None else StaticLayer(0, 0)
+    self.index = SpatialIndex()
+    self.game_state = Game.RUNNING
+    # everything random in the game comes from here, so the same seed and the
+    # same keys at the same steps always play out the same way.
+    self.seed = seed if seed is not None else random.randrange(1 << 32)
+    self.rng = random.Random(self.seed)
+    # how many times step() has been called. keypresses are recorded against it.
+    self.step_count = 0
+    self.recording: InputTrace|None = None
+    self.projectiles = ProjectilePool()
+    # objects that called signal_removal_from_game() since the last tick.
+    self.removal_queue: list[GameObject] = []
+    # the flag might not exist yet if it's in a chunk that hasn't woken up.
+    self.ending_flag = None
+    for i in self.items:
+      self.index.add(i)
+      i.added_to_game(self)
+      self.track_item(i)
+    self.lock = threading.Lock()
+    self.score = (0, 0)
+    self.status_msg = None
+    self.speed_boost = 0
+    self.level = level
+    self.debug_msg_key = None
+    self.debug_msg_str = ""
+    self.initial_snapshot = self.snapshot()
+    # a snapshot from before each of the last rewind_ticks ticks.
+    self.rewind_ticks = rewind_ticks
+    self.history: deque[GameSnapshot]|None = deque(maxlen=rewind_ticks) if rewind_ticks > 0 else None
+
+  def acquire_lock(self):
+    self.lock.acquire()
+  
+  def release_lock(self):
+    self.lock.release()
+
+  def game_over(self):
+    return self.game_state in [Game.LOST, Game.QUIT, Game.WON]
+  
+  def items_at(self, positions_to_check):
+    return self.static.items_at(positions_to_check) + self.index.items_at(positions_to_check)
+  
+  def is_empty(self, pos):
+    # the same as items_at([pos]) == [], without building the list.
+    return not self.static.is_solid(pos) and not self.index.is_occupied(pos)
+
+  def add_item(self, item):
+    self.items.append(item)
+    self.index.add(item)
+    item.added_to_game(self)
+    self.track_item(item)
+
+  def track_item(self, item):
+    if isinstance(item, Player):
+      self.player = item
+    elif isinstance(item, EndingFlag):
+      self.ending_flag = item
+
+  def resume_item(self, item):
+    # puts back an item that suspend_items() took out.
+    self.items.append(item)
+    self.index.add(item)
+    self.track_item(item)
+
+  def suspend_items(self, items):
+    # takes items out of play without removing them for good, e.g. when the
+    # world parks the chunk they're in.
+    suspended = set(items)
+    self.items = [i for i in self.items if i not in suspended]
+    for i in items:
+      self.index.remove(i)
+
+  def item_moved(self, item):
+    self.index.update(item)
+
+  def snapshot(self) -> GameSnapshot:
+    return GameSnapshot(list(self.items), [item.snapshot_state() for item in self.items],
+                        self.rng.getstate(), self.world.snapshot() if self.world is not None else None,
+                        self.game_state, self.status_msg, self.score, self.speed_boost)
+
+  def restore(self, snapshot: GameSnapshot) -> None:
+    # anything added since the snapshot (fireballs, cannonballs) is dropped and
+    # anything removed since comes back.
+    for item, state in zip(snapshot.items, snapshot.states):
+      item.restore_state(state)
+    self.items = list(snapshot.items)
+    self.index = SpatialIndex()
+    # the flag might come from a chunk that wasn't built yet at the snapshot,
+    # so it has to be found again rather than kept from the later timeline.
+    self.player = None
+    self.ending_flag = None
+    for item in self.items:
+      self.index.add(item)
+      self.track_item(item)
+    self.removal_queue.clear()
+    # the snapshot might have brought back objects that were in the pool.
+    self.projectiles.clear()
+    self.projectiles.reset_in_flight(self.items)
+    self.rng.setstate(snapshot.rng_state)
+    if self.world is not None:
+      self.world.restore(snapshot.world)
+    self.game_state = snapshot.game_state
+    self.status_msg = snapshot.status_msg
+    self.score = snapshot.score
+    self.speed_boost = snapshot.speed_boost
+
+  def restart(self) -> None:
+    try:
+      self.acquire_lock()
+      if self.recording is not None:
+        self.recording.record(self.step_count, RESTART)
+      self.restore(self.initial_snapshot)
+      if self.history is not None:
+        self.history.clear()
+    finally:
+      self.release_lock()
+
+  def rewind(self, ticks: int) -> bool:
+    # goes back up to ticks ticks, or as far as the history goes. returns
+    # False if there was nothing to go back to.
+    if not self.history:
+      return False
+    snapshot = self.history.pop()
+    for _ in range(ticks - 1):
+      if not self.history:
+        break
+      snapshot = self.history.pop()
+    self.restore(snapshot)
+    return True
+  
+  def debug_msg(self):
+    #return ""
+    # only formatted again when something in it changes.
+    key = (self.player.position, self.player.velocity, debugger.get_log_str())
+    if key != self.debug_msg_key:
+      x = []
+      item = self.player
+      if isinstance(item, MovableObject):
+        x.append(f"Pos: {item.position}, Vel: {item.velocity}")
+      self.debug_msg_key = key
+      self.debug_msg_str = "|".join(x) + debugger.get_log_str()
+    return self.debug_msg_str
+
+  def tick(self):
+    if self.game_over():
+      # this shouldn't really get called if the game's over.
+      return None
+    
+    for item in self.items:
+      item.tick(self)
+      # some objects change shape when they tick (fire, firelines).
+      self.index.update(item)
+
+    if self.removal_queue:
+      self.remove_queued_items()
+
+    if self.world is not None:
+      self.world.update(self)
+
+    if self.ending_flag is not None and self.ending_flag.had_collision:
+      return Game.TICK_WIN
+    
+    if self.player.should_be_removed_from_game():
+      return Game.TICK_LOSS
+
+    return Game.TICK_CONTINUING
+  
+  def remove_queued_items(self):
+    # the player stays put even when it dies, so the game can show it.
+    dead = set(item for item in self.removal_queue if item is not self.player)
+    self.removal_queue.clear()
+    if len(dead) == 0:
+      return
+    self.items = [i for i in self.items if i not in dead]
+    for i in dead:
+      self.index.remove(i)
+      if isinstance(i, Projectile):
+        self.projectiles.release(i)
+
+  def render(self, game_window: GameWindow):
+    game_window.clear()
+    game_area = game_window.game_area()
+    game_area.set_world_size(*self.static.world_size)
+    # work out what's on screen first and only render what's in it.
+    player_location = self.player.positions()
+    viewport = game_area.center_around(player_location)
+    self.static.render(game_area, *viewport)
+    for item in self.index.items_in_rect(*viewport):
+      item.render(game_area)
+    if self.status_msg is not None:
+      height, width = game_window.status_area().getmaxyx()
+      avail_width = width - ((width - len(self.status_msg)) // 2)
+      game_window.set_status_line(2, self.status_msg[:avail_width-1], (width - len(self.status_msg)) // 2)
+    else:
+      game_window.set_status_line(2, None)
+    game_window.set_status_line(1, "Type 'e' to exit. 'r' to restart. 'p' to pause. Up/left/right/down to move.")
+    game_window.set_status_line(3, self.debug_msg())
+    game_window.refresh(player_location, viewport)
+
+  def step(self) -> bool:
+    # advances the game one tick. returns False once the game is over.
+    try:
+      self.acquire_lock()
+      self.step_count += 1
+
+      if self.game_state == Game.RUNNING:
+        if self.history is not None:
+          self.history.append(self.snapshot())
+        tick_result = self.tick()
+
+        if tick_result == Game.TICK_WIN:
+          self.status_msg = "You've completed the level! 's' to pick a level, 'p' for next, 'e' to exit, 'r' to restart."
+          self.game_state = Game.WON
+        elif tick_result == Game.TICK_LOSS:
+          self.status_msg = "Oh no! You died. :( :( Hit 'r' to restart or 'e' to exit."
+          self.game_state = Game.LOST
+
+      return not self.game_over()
+    finally:
+      self.release_lock()
+
+  def draw(self, game_window: GameWindow):
+    try:
+      self.acquire_lock()
+      self.render(game_window)
+    finally:
+      self.release_lock()
+
+  def start_loop(self, game_window: GameWindow) -> GameLoop:
+    loop = GameLoop(self.step, lambda: self.draw(game_window), self.speed)
+    loop.start()
+    return loop
+
+  def speed(self):
+    total_score = self.score[0] + self.score[1]
+    base_speed = 0.1
+    adjustment_by_score = 0.005*total_score
+    boost_multiplier = 1
+    boost_denominator = 1
+    if self.speed_boost < 0:
+      boost_multiplier = -1 * self.speed_boost
+    else:
+      boost_denominator = 1 + self.speed_boost
+    max_speed = 0.02
+    min_speed = 0.5
+
+    return min(min_speed, max(max_speed, ((base_speed - adjustment_by_score) * boost_multiplier) / boost_denominator))
+  
+  def accept_keypress(self, k, stdscr: curses.window):
+    try:
+      self.acquire_lock()
+      if self.recording is not None:
+        self.recording.record(self.step_count, k)
+      if k == "p":
+        if self.game_state in [Game.PAUSED, Game.WAITING_FOR_NEXT_LEVEL]:
+          self.game_state = Game.RUNNING
+          self.status_msg = None
+        else:
+          self.game_state = Game.PAUSED
+          self.status_msg = "Game paused. Press 'p' to continue."
+      elif k == " " or k == "KEY_UP":
+        self.player.jump()
+      elif k == "f":
+        self.player.fire(self)
+      elif k == "KEY_RIGHT":
+        self.player.right()
+      elif k == "KEY_LEFT":
+        self.player.left()
+      elif k == "KEY_DOWN":
+        self.player.down()
+      elif k == "e":
+        self.game_state = Game.QUIT
+      elif k == "z":
+        self.rewind(Game.REWIND_STEP)
+      elif k == "f":
+        self.speed_boost = min(5, 1 + self.speed_boost)
+      elif k == "s":
+        self.speed_boost = max(-5, self.speed_boost - 1)
+    finally:
+      self.release_lock()
+
+def new_game(template: CompiledLevel, level, **kwargs) -> Game:
+  # starts a game on a compiled level with only the chunks around the player
+  # awake. kwargs are passed on to Game.
+  world = ChunkedWorld(template.actors)
+  return Game(world.initial_items(), level, template.static_layer(), world=world, **kwargs)
+
+def stream_game(fname: str, level, **kwargs) -> Game:
+  # starts a game straight from a level file, reading only the chunks around
+  # the player. the rest is read as the player gets near it.
+  stream = LevelStream(fname)
+  world = ChunkedWorld([], stream=stream)
+  return Game(world.initial_items(), level, stream.static, world=world, **kwargs)
+
+def load_initial_state(fname):
+  # goes through the compiled level cache, which only parses the text file
+  # when it's new or has changed.
+  return load_level(fname)
@@ -0,0 +1,85 @@
+# maps each (y, x) cell to the game objects in it so collision checks only look
+# at the cells they ask about. items come back in the order they were added,
+# which is the same order as the game's item list.
+class SpatialIndex(object):
+  def __init__(self):
+    self.__cells: dict[tuple[int, int], list] = {}
+    self.__item_cells: dict[object, tuple[tuple[int, int], ...]] = {}
+    self.__order: dict[object, int] = {}
+    self.__next_order = 0
+
+  def __len__(self) -> int:
+    return len(self.__item_cells)
+
+  def __contains__(self, item) -> bool:
+    return item in self.__item_cells
+
+  def add(self, item) -> None:
+    if item in self.__item_cells:
+      self.update(item)
+      return
+    self.__order[item] = self.__next_order
+    self.__next_order += 1
+    cells = tuple(item.positions())
+    self.__item_cells[item] = cells
+    for cell in cells:
+      self.__cells.setdefault(cell, []).append(item)
+
+  def remove(self, item) -> None:
+    cells = self.__item_cells.pop(item, None)
+    if cells is None:
+      return
+    del self.__order[item]
+    for cell in cells:
+      self.__remove_from_cell(cell, item)
+
+  def update(self, item) -> None:
+    # re-reads the item's positions and moves it to its new cells.
+    old_cells = self.__item_cells.get(item)
+    if old_cells is None:
+      return
+    new_cells = tuple(item.positions())
+    if new_cells == old_cells:
+      return
+    for cell in old_cells:
+      self.__remove_from_cell(cell, item)
+    for cell in new_cells:
+      self.__cells.setdefault(cell, []).append(item)
+    self.__item_cells[item] = new_cells
+
+  def is_occupied(self, cell: tuple[int, int]) -> bool:
+    return cell in self.__cells
+
+  def items_at(self, positions_to_check) -> list:
+    found = []
+    for position in positions_to_check:
+      for item in self.__cells.get(position, ()):
+        if item not in found:
+          found.append(item)
+    if len(found) > 1:
+      found.sort(key=self.__order.__getitem__)
+    return found
+
+  def items_in_rect(self, bottom_left: tuple[int, int], top_right: tuple[int, int]) -> list:
+    # every item with at least one cell in [bottom_left, top_right). small
+    # rectangles look up each cell, big ones check each item instead.
+    bottom, left = bottom_left
+    top, right = top_right
+    found = set()
+    if (top - bottom) * (right - left) < len(self.__cells):
+      for y in range(bottom, top):
+        for x in range(left, right):
+          found.update(self.__cells.get((y, x), ()))
+    else:
+      for item, cells in self.__item_cells.items():
+        for y, x in cells:
+          if bottom <= y < top and left <= x < right:
+            found.add(item)
+            break
+    return sorted(found, key=self.__order.__getitem__)
+
+  def __remove_from_cell(self, cell, item) -> None:
+    occupants = self.__cells[cell]
+    occupants.remove(item)
+    if len(occupants) == 0:
+      del self.__cells[cell]
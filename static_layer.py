@@ -0,0 +1,80 @@
+from buffered_window import BufferedCenterableWindow
+from game_items import Brick
+
+# plain bricks never move or tick, so instead of keeping an object for each one
+# the level keeps a single occupancy grid. a Brick object is only made for a
+# cell when something actually runs into it.
+class StaticLayer(object):
+  EMPTY = 0
+  BRICK = 1
+
+  def __init__(self, height: int, width: int, cells: bytes|None=None):
+    self.height = height
+    self.width = width
+    # cells can come straight from a compiled level, one byte per cell.
+    if cells is not None:
+      if len(cells) != height * width:
+        raise ValueError(f"expected {height * width} cells, got {len(cells)}")
+      self.__cells = bytearray(cells)
+      self.__count = self.__cells.count(StaticLayer.BRICK)
+    else:
+      self.__cells = bytearray(height * width)
+      self.__count = 0
+    self.__bricks: dict[tuple[int, int], Brick] = {}
+    # the size of everything in the level, not just the bricks. the loader
+    # fills this in so the window doesn't have to work it out every frame.
+    self.world_size: tuple[int, int] = (height, width)
+
+  def __len__(self) -> int:
+    return self.__count
+
+  def to_bytes(self) -> bytes:
+    return bytes(self.__cells)
+
+  def __offset(self, pos: tuple[int, int]) -> int:
+    y, x = pos
+    if 0 <= y < self.height and 0 <= x < self.width:
+      return y * self.width + x
+    return -1
+
+  def add(self, pos: tuple[int, int]) -> None:
+    offset = self.__offset(pos)
+    if offset < 0:
+      raise ValueError(f"{pos} is outside of a {self.height}x{self.width} level")
+    if self.__cells[offset] == StaticLayer.EMPTY:
+      self.__count += 1
+    self.__cells[offset] = StaticLayer.BRICK
+
+  def is_solid(self, pos: tuple[int, int]) -> bool:
+    offset = self.__offset(pos)
+    return offset >= 0 and self.__cells[offset] != StaticLayer.EMPTY
+
+  def items_at(self, positions_to_check) -> list[Brick]:
+    ret = []
+    for pos in positions_to_check:
+      offset = self.__offset(pos)
+      if offset < 0 or self.__cells[offset] == StaticLayer.EMPTY:
+        continue
+      brick = self.__bricks.get(pos)
+      if brick is None:
+        brick = Brick(pos)
+        self.__bricks[pos] = brick
+      if brick not in ret:
+        ret.append(brick)
+    return ret
+
+  def render(self, stdscr: BufferedCenterableWindow, bottom_left=None, top_right=None) -> None:
+    # only draws the cells inside [bottom_left, top_right) when given.
+    bottom, left = bottom_left if bottom_left is not None else (0, 0)
+    top, right = top_right if top_right is not None else (self.height, self.width)
+    bottom, left = max(0, bottom), max(0, left)
+    top, right = min(self.height, top), min(self.width, right)
+    cells = self.__cells
+    for y in range(bottom, top):
+      start = y * self.width
+      end = start + right
+      start_x = start + left
+      offset = cells.find(StaticLayer.BRICK, start_x, end)
+      while offset != -1:
+        stdscr.addch(y, offset - start, "=")
+        offset = cells.find(StaticLayer.BRICK, offset + 1, end)
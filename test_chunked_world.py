@@ -0,0 +1,45 @@
+import os
+import tempfile
+import unittest
+from level_cache import compile_level
+from level_generator import write_level
+from side_scroller_game import Game, new_game
+
+class FarFlagTest(unittest.TestCase):
+  # the flag is far enough from the start that its chunk is only built once
+  # the player gets near it.
+  def setUp(self):
+    self.dir = tempfile.TemporaryDirectory()
+    fname = os.path.join(self.dir.name, "far-flag.txt")
+    write_level(fname, 20, 2000, seed=1, density=0)
+    self.game = new_game(compile_level(fname)[0], 1, seed=1, rewind_ticks=100)
+    self.assertIsNone(self.game.ending_flag)
+
+  def tearDown(self):
+    self.dir.cleanup()
+
+  def win(self):
+    self.game.player.position = (1, 1990)
+    self.game.item_moved(self.game.player)
+    for _ in range(60):
+      self.game.accept_keypress("KEY_RIGHT", None)
+      if not self.game.step():
+        break
+    self.assertEqual(self.game.game_state, Game.WON)
+
+  def test_restart_forgets_flag(self):
+    self.win()
+    self.game.restart()
+    self.assertIsNone(self.game.ending_flag)
+    self.assertNotEqual(self.game.tick(), Game.TICK_WIN)
+
+  def test_rewind_forgets_flag(self):
+    self.game.step()
+    snapshot = self.game.snapshot()
+    self.win()
+    self.game.restore(snapshot)
+    self.assertIsNone(self.game.ending_flag)
+    self.assertNotEqual(self.game.tick(), Game.TICK_WIN)
+
+if __name__ == "__main__":
+  unittest.main()